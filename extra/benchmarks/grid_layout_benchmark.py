@@ -0,0 +1,78 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Per frame layout cost of the overlay grid while scrolling through a big library.
+
+Run it with any python 3, Blender is not needed:
+    python extra/benchmarks/grid_layout_benchmark.py [item count]
+"""
+
+import importlib.util
+import random
+import sys
+import time
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location(
+    "grid_layout", Path(__file__).parents[2].joinpath("uas_assetbank", "grid_layout.py")
+)
+grid_layout = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(grid_layout)
+
+
+def scroll_frame(layout):
+    """
+    What the overlay does each frame while scrolling: animate, find the tiles in view and place them.
+    """
+    layout.animate(1 / 60)
+    first, end = layout.visible_range(margin_rows=1)
+    return [layout.tile_origin(index) for index in range(first, end)]
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    layout = grid_layout.GridLayout(item_count, width=1920, height=460, tile_size=150)
+    print(f"{item_count} items, {layout.columns} columns, {layout.rows} rows")
+
+    frames = 0
+    start = time.perf_counter()
+    while layout.scroll < layout.max_scroll:
+        layout.scroll_rows(3)
+        for _ in range(10):
+            scroll_frame(layout)
+            frames += 1
+    elapsed = time.perf_counter() - start
+    print(f"scrolled to the end in {frames} frames, {elapsed / frames * 1e6:.1f} us per frame")
+
+    names = sorted(f"asset_{random.random():.8f}" for _ in range(item_count))
+    start = time.perf_counter()
+    for letter in "abcdefghijklmnopqrstuvwxyz" * 100:
+        layout.scroll_to_index(grid_layout.index_of_prefix(names, letter), smooth=False)
+    elapsed = time.perf_counter() - start
+    print(f"jump to letter: {elapsed / 2600 * 1e6:.1f} us")
+
+    points = [(random.uniform(0, layout.width), random.uniform(0, layout.height)) for _ in range(100000)]
+    start = time.perf_counter()
+    for x, y in points:
+        layout.hit_test(x, y)
+    elapsed = time.perf_counter() - start
+    print(f"hit test: {elapsed / len(points) * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Size and load time of a synthetic library in each library format.
+
+Run it with any python 3, Blender is not needed:
+    python extra/benchmarks/library_format_benchmark.py [entry count]
+"""
+
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location(
+    "library_format", Path(__file__).parents[2].joinpath("uas_assetbank", "library_format.py")
+)
+library_format = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(library_format)
+
+
+def make_library(count):
+    library = dict()
+    for i in range(count):
+        folder = f"//fileserver/projects/show/assets/library/set_{i % 50:02d}"
+        name = f"Asset_{i:06d}"
+        library[f"{name}:set_{i % 50:02d}"] = {
+            "blend_path": f"{folder}/{name}.blend",
+            "data_name": name,
+            "thumbnail_path": f"{folder}/thumbnails/UASBANK_{name}_{name}.jpg",
+            "tags": ["props", f"set_{i % 50:02d}"],
+            "version": 1,
+        }
+    return library
+
+
+def measure(path, library, repeat=3):
+    start = time.perf_counter()
+    raw = library_format.encode(path, library)
+    encode_time = time.perf_counter() - start
+    load_time = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        library_format.decode(path, raw)
+        load_time = min(load_time, time.perf_counter() - start)
+    return len(raw), encode_time, load_time
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    library = make_library(count)
+    formats = [("indented", "bank.json", False), ("compact", "bank.json", True), ("gzip", "bank.json.gz", True)]
+    try:
+        import zstandard  # noqa: F401
+
+        formats.append(("zstd", "bank.json.zst", True))
+    except ImportError:
+        print("zstandard is not installed, skipping .json.zst")
+
+    print(f"{count} entries")
+    print(f"{'format':<10}{'size (MB)':>12}{'write (ms)':>12}{'load (ms)':>12}")
+    for label, path, compact in formats:
+        library_format.compact = compact
+        size, encode_time, load_time = measure(path, library)
+        print(f"{label:<10}{size / 1e6:>12.2f}{encode_time * 1e3:>12.1f}{load_time * 1e3:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
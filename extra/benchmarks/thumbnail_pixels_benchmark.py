@@ -0,0 +1,95 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Cost of preparing the pixels of a thumbnail texture, before and after the 8 bit upload.
+
+Run it with any python 3, Blender and a gpu are not needed:
+    python extra/benchmarks/thumbnail_pixels_benchmark.py [thumbnail size]
+
+The ImagePreview pixel arrays are emulated: their foreach_get is a memory copy, like Blender's.
+"""
+
+import importlib.util
+import sys
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+
+spec = importlib.util.spec_from_file_location(
+    "thumbnail_pixels", Path(__file__).parents[2].joinpath("uas_assetbank", "thumbnail_pixels.py")
+)
+thumbnail_pixels = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(thumbnail_pixels)
+
+
+class PreviewArray:
+    """
+    Stands for bpy_prop_array: items are python objects created on access, foreach_get copies in bulk.
+    """
+
+    def __init__(self, data: array):
+        self._data = data
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data.tolist())
+
+    def foreach_get(self, seq):
+        memoryview(seq).cast("B")[:] = memoryview(self._data).cast("B")
+
+
+def float_path(image_pixels_float, width, height):
+    # What GlTexture did: a list of python floats copied into a float buffer.
+    return array("f", list(image_pixels_float))
+
+
+def byte_path(image_pixels, width, height):
+    return thumbnail_pixels.read_rgba8(image_pixels, width, height)
+
+
+def measure(function, pixels, width, height, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(pixels, width, height)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    function(pixels, width, height)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    count = size * size
+    float_pixels = PreviewArray(array("f", [0.5]) * (count * 4))
+    int_pixels = PreviewArray(array("i", [0x7F7F7F7F]) * count)
+
+    print(f"{size}x{size} thumbnail")
+    print(f"{'upload':<8}{'time (ms)':>12}{'peak memory (MB)':>20}")
+    for label, function, pixels in (("float", float_path, float_pixels), ("rgba8", byte_path, int_pixels)):
+        best, peak = measure(function, pixels, size, size)
+        print(f"{label:<8}{best * 1e3:>12.2f}{peak / 1e6:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,13 +15,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import functools
 import os
-import subprocess
 
 import bpy
 from bpy.props import StringProperty, BoolProperty
 
-from uas_assetbank.api import UAS_AssetBank_Store, EntryData
+from uas_assetbank.api import UAS_AssetBank_Store, EntryData, get_publish_pool
 
 
 def on_import_post(scene, imported_collection):
@@ -29,6 +29,12 @@ def on_import_post(scene, imported_collection):
     pass
 
 
+def on_import_batch_post(scene, imported_instances):
+    # Called once by instance_asset with all the created instances.
+    for instance in imported_instances:
+        on_import_post(scene, instance)
+
+
 class MY_STORE(UAS_AssetBank_Store):
     # You could expose other things like a category or description so you could fill in other type of informations
     # on an asset tracker. Although they won't be used by the addon nor showed.
@@ -44,26 +50,24 @@ class MY_STORE(UAS_AssetBank_Store):
 
         return context.window_manager.invoke_props_dialog(self)
 
+    def plugin_pre_execute(self, collections):
+        # When banking the children of a collection, the asset names are the collection names.
+        if not self.is_batch:
+            collections[0].name = self.asset
+        self.save_file = True  # The publish process reads the saved file.
+
     def plugin_execute(self, collection, library_dir):
         # self.backup = False # If you don't need backup
         # self.export_thumbnail = False  # Handle thumbnail generation here if you have other ways of making/getting the thumbnail.
+        # self.skip_unchanged = True  # Also skip collections whose computed fingerprint did not change since banked.
 
-        asset_name = self.asset
-        collection.name = asset_name
-        bpy.ops.wm.save_as_mainfile()
+        asset_name = collection.name
 
         dst_blend = os.path.join(library_dir, f"{asset_name}.blend")
-        subprocess.call(
-            [
-                bpy.app.binary_path,
-                "--python",
-                os.path.dirname(__file__) + "/asset_bank_publish.py",
-                "--",
-                dst_blend,
-                bpy.data.filepath,
-                collection.name,
-            ]
-        )
+        # Writing the asset file is slow, it is done by the banking job, possibly in background, by a Blender process
+        # of the publish pool which stays alive between banks.
+        pool = get_publish_pool(bpy.app.binary_path, os.path.dirname(__file__) + "/asset_bank_publish.py")
+        publish = functools.partial(pool.publish, dst_blend, bpy.data.filepath, collection.name)
 
         return EntryData(
             asset_name,
@@ -72,6 +76,7 @@ class MY_STORE(UAS_AssetBank_Store):
                 library_dir, f"thumbnails/{asset_name}.jpg"
             ),  # Currenly jpeg is hardcoded in the builtin thumbnail exporter. Don't put other extension because they will get overriden.
             tags=[s.strip() for s in self.tags.split(";")],
+            publish=publish,
         )
 
 
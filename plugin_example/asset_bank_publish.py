@@ -17,34 +17,55 @@
 
 """
 Appends a collection from another blend file. And saves it.
+
+Usage:
+ - blender --background --python asset_bank_publish.py -- dest_blend src_blend collection [dest_blend src_blend collection ...]
+   processes all the given jobs in this process.
+ - blender --background --python asset_bank_publish.py -- --server
+   worker of uas_assetbank.publish_service: processes the json jobs read on stdin until it is closed.
 """
 
 import argparse
+import json
 import sys
 from pathlib import Path
 import bpy
 
+RESULT_PREFIX = "UAS_ASSETBANK_PUBLISH:"  # Must match uas_assetbank.publish_service.RESULT_PREFIX
 
-def clean_scene():
-    bl_data = bpy.data
-    for object in bl_data.objects:
-        bl_data.objects.remove(object)
 
-    for col in bl_data.collections:
-        bl_data.collections.remove(col)
+def clean_scene():
+    bpy.ops.wm.read_factory_settings(use_empty=True)
 
 
 def export(dest_blend, src_blend, collection):
-    if Path(src_blend).exists():
-        with bpy.data.libraries.load(src_blend, link=False) as (data_from, data_to):
-            if collection in data_from.collections:
-                data_to.collections.append(data_from.collections[data_from.collections.index(collection)])
+    if not Path(src_blend).exists():
+        raise ValueError(f"{src_blend} does not exist.")
 
-        for coll in data_to.collections:
-            bpy.context.scene.collection.children.link(coll)
+    with bpy.data.libraries.load(src_blend, link=False) as (data_from, data_to):
+        if collection in data_from.collections:
+            data_to.collections.append(data_from.collections[data_from.collections.index(collection)])
+
+    if not data_to.collections:
+        raise ValueError(f"{collection} could not be found in {src_blend}.")
+    for coll in data_to.collections:
+        bpy.context.scene.collection.children.link(coll)
 
     bpy.ops.wm.save_as_mainfile(filepath=dest_blend)
-    sys.exit(0)
+
+
+def serve():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            clean_scene()
+            export(job["dest_blend"], job["src_blend"], job["collection"])
+            result = {"ok": True}
+        except Exception as e:
+            result = {"ok": False, "error": str(e) or type(e).__name__}
+        print(RESULT_PREFIX + json.dumps(result), flush=True)
 
 
 if __name__ == "__main__":
@@ -53,11 +74,22 @@ if __name__ == "__main__":
     else:
         argv = sys.argv[sys.argv.index("--") + 1 :]  # get all args after "--"
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("dest_blend")
-    parser.add_argument("src_blend")
-    parser.add_argument("collection_to_append")
+    if argv == ["--server"]:
+        serve()
+        sys.exit(0)
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument("jobs", nargs="+", metavar="dest_blend src_blend collection_to_append")
     args = parser.parse_args(argv)
-    clean_scene()
-    export(args.dest_blend, args.src_blend, args.collection_to_append)
+    if len(args.jobs) % 3:
+        parser.error("jobs are made of 3 arguments: dest_blend src_blend collection_to_append")
+
+    failed = False
+    for i in range(0, len(args.jobs), 3):
+        clean_scene()
+        try:
+            export(*args.jobs[i : i + 3])
+        except ValueError as e:
+            print(e)
+            failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,68 @@
+from uas_assetbank import asset_store
+from uas_assetbank.asset_store import AssetRecord
+
+
+def _record(identifier, library="props"):
+    return AssetRecord(identifier, library, f"/bank/{identifier}.blend", identifier)
+
+
+def test_maps():
+    asset_store.set_assets(
+        [_record("Tree:a"), _record("Rock:b", "sets"), _record("Tree:a", "sets")],
+        {"props": "/bank/props.json", "sets": "/bank/sets.json"},
+    )
+    assert asset_store.find("Rock:b").library == "sets"
+    assert asset_store.library_path("Rock:b") == "/bank/sets.json"
+    # The first library holding an identifier wins.
+    assert asset_store.find("Tree:a").library == "props"
+    assert asset_store.library_path("Tree:a") == "/bank/props.json"
+    assert asset_store.find("Bush:c") is None
+    assert asset_store.library_path("Bush:c") is None
+
+
+def test_put_and_remove():
+    asset_store.set_assets([_record("Tree:a"), _record("Rock:b")], {"props": "/bank/props.json"})
+    asset_store.find("Tree:a").checked = True
+
+    new_tree = _record("Tree:a")
+    previous = asset_store.put(new_tree, "/bank/props.json")
+    assert previous is not None and previous is not new_tree
+    assert asset_store.assets[0] is new_tree
+    assert new_tree.checked
+    assert asset_store.put(_record("Bush:c"), "/bank/props.json") is None
+    assert [asset.identifier for asset in asset_store.assets] == ["Tree:a", "Rock:b", "Bush:c"]
+
+    removed = asset_store.remove("Rock:b")
+    assert removed.identifier == "Rock:b"
+    assert asset_store.find("Rock:b") is None
+    assert asset_store.library_path("Rock:b") is None
+    assert asset_store.remove("Rock:b") is None
+    assert [asset.identifier for asset in asset_store.assets] == ["Tree:a", "Bush:c"]
+    assert [asset.identifier for asset in asset_store.checked_assets()] == ["Tree:a"]
+
+
+def test_library_order():
+    libraries = {"props": "/bank/props.json", "sets": "/bank/sets.json"}
+    # Partially reloaded libraries come last in the records, the order of the libraries still decides.
+    asset_store.set_assets([_record("Tree:a", "sets"), _record("Tree:a", "props")], libraries)
+    assert asset_store.find("Tree:a").library == "props"
+    assert [asset.library for asset in asset_store.assets] == ["props", "sets"]
+
+    # Removing the asset of the first library makes the one of the next library found.
+    removed = asset_store.remove("Tree:a", "props")
+    assert removed.library == "props"
+    assert asset_store.find("Tree:a").library == "sets"
+    assert asset_store.library_path("Tree:a") == "/bank/sets.json"
+
+    # An asset added to the first library takes over, an asset added to the next one does not.
+    asset_store.put(_record("Tree:a", "props"), "/bank/props.json")
+    assert asset_store.find("Tree:a").library == "props"
+    asset_store.put(_record("Rock:b", "props"), "/bank/props.json")
+    asset_store.put(_record("Rock:b", "sets"), "/bank/sets.json")
+    assert asset_store.find("Rock:b").library == "props"
+    assert asset_store.library_path("Rock:b") == "/bank/props.json"
+
+    assert asset_store.remove("Rock:b", "sets").library == "sets"
+    assert asset_store.find("Rock:b").library == "props"
+    assert asset_store.remove("Rock:b").library == "props"
+    assert asset_store.find("Rock:b") is None and asset_store.remove("Rock:b") is None
@@ -0,0 +1,50 @@
+import json
+
+from uas_assetbank import backups
+
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_backup_points(tmp_path, monkeypatch):
+    monkeypatch.setattr(backups, "keep", 3)
+    monkeypatch.setattr(backups, "interval", 3600.0)
+    path = tmp_path / "bank.json"
+    data = {f"Asset{i}:props": {"data_name": f"Asset{i}"} for i in range(10)}
+    _write(path, data)
+
+    first = backups.backup(path)
+    assert first.kind == backups.FULL
+    assert backups.backup(path) is None  # Within the interval.
+    assert backups.backup(path, force=True) is None  # Nothing changed.
+
+    del data["Asset0:props"]
+    data["Asset1:props"]["tags"] = ["rock"]
+    _write(path, data)
+    second = backups.backup(path, force=True)
+    assert second.kind == backups.DELTA
+    assert backups.load_point(path, second.id) == data
+    assert backups.load_point(path, first.id)["Asset0:props"] == {"data_name": "Asset0"}
+
+    data = {"Other:props": {"data_name": "Other"}}
+    _write(path, data)
+    assert backups.backup(path, force=True).kind == backups.FULL
+    for i in range(3):
+        data[f"New{i}:props"] = {"data_name": f"New{i}"}
+        _write(path, data)
+        backups.backup(path, force=True)
+
+    points = backups.list_points(path)
+    assert len(points) == 3
+    assert backups.load_point(path, points[0].id) == data
+
+
+def test_lzma(tmp_path, monkeypatch):
+    monkeypatch.setattr(backups, "compression", "LZMA")
+    path = tmp_path / "bank.json"
+    _write(path, {"Rock:props": {"data_name": "Rock"}})
+    point = backups.backup(path)
+    assert point.path.name.endswith(".json.xz")
+    assert backups.load_point(path, point.id) == {"Rock:props": {"data_name": "Rock"}}
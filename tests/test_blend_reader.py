@@ -0,0 +1,106 @@
+import gzip
+import struct
+import zlib
+
+import pytest
+
+from uas_assetbank import blend_reader
+from uas_assetbank.blend_reader import BlendFile, BlendFileError, read_collection_names, read_collection_previews
+
+
+def _sdna_block():
+    def strings(values):
+        data = b"".join(v.encode() + b"\x00" for v in values)
+        return data + b"\x00" * (-len(data) % 4)
+
+    names = ["*next", "*prev", "name[66]", "w[2]", "h[2]", "flag[2]", "*rect[2]"]
+    types = ["char", "short", "int", "void", "ID", "PreviewImage"]
+    lengths = [1, 2, 4, 0, 74, 32]
+    structs = [
+        (4, [(3, 0), (3, 1), (0, 2)]),  # ID: next, prev, name
+        (5, [(2, 3), (2, 4), (1, 5), (2, 6)]),  # PreviewImage: w, h, flag, rect
+    ]
+    data = b"SDNA" + b"NAME" + struct.pack("<i", len(names)) + strings(names)
+    data += b"TYPE" + struct.pack("<i", len(types)) + strings(types)
+    tlen = struct.pack(f"<{len(lengths)}h", *lengths)
+    data += b"TLEN" + tlen + b"\x00" * (-len(tlen) % 4)
+    data += b"STRC" + struct.pack("<i", len(structs))
+    for type_index, fields in structs:
+        data += struct.pack("<hh", type_index, len(fields))
+        for field in fields:
+            data += struct.pack("<hh", *field)
+    return data
+
+
+def _block(code, data, sdna_index=0):
+    return struct.pack("<4siQii", code, len(data), 1, sdna_index, 1) + data
+
+
+def _collection(name):
+    return _block(b"GR\x00\x00", struct.pack("<QQ", 0, 0) + (b"GR" + name.encode()).ljust(66, b"\x00"), 0)
+
+
+def _preview(width, height, color):
+    data = struct.pack("<IIIIhhQQ", 16, width, 16, height, 0, 0, 1, 2)
+    return (
+        _block(b"DATA", data, 1)
+        + _block(b"DATA", bytes([255, 0, 0, 255]) * 16 * 16)
+        + _block(b"DATA", bytes(color) * width * height)
+    )
+
+
+def _write_blend(path, compress=False):
+    data = b"BLENDER-v283"
+    data += _collection("Rock") + _preview(32, 16, (0, 255, 0, 255))
+    data += _collection("Tree")
+    data += _block(b"DNA1", _sdna_block())
+    data += _block(b"ENDB", b"")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(data) if compress else data)
+
+
+def test_collection_names(tmp_path):
+    path = tmp_path / "props.blend"
+    _write_blend(path)
+    assert read_collection_names(path) == ["Rock", "Tree"]
+
+    with BlendFile(path) as blend:
+        assert blend.pointer_size == 8
+        assert blend.version == "283"
+
+
+def test_compressed_previews(tmp_path):
+    path = tmp_path / "props.blend"
+    _write_blend(path, compress=True)
+    previews = read_collection_previews(path)
+    assert list(previews) == ["Rock"]
+    assert (previews["Rock"].width, previews["Rock"].height) == (32, 16)
+    assert previews["Rock"].pixels == bytes((0, 255, 0, 255)) * 32 * 16
+
+    png = previews["Rock"].to_png()
+    assert png.startswith(b"\x89PNG")
+    idat = png.index(b"IDAT")
+    length = struct.unpack(">I", png[idat - 4 : idat])[0]
+    assert len(zlib.decompress(png[idat + 4 : idat + 4 + length])) == 16 * (1 + 32 * 4)
+
+
+def test_truncated_file(tmp_path, monkeypatch):
+    streams = list()
+    open_decompressed = blend_reader._open_decompressed
+
+    def record_stream(path):
+        streams.append(open_decompressed(path))
+        return streams[-1]
+
+    monkeypatch.setattr(blend_reader, "_open_decompressed", record_stream)
+    path = tmp_path / "props.blend"
+    sdna = _sdna_block()
+    for data in (
+        b"BLENDER-v283" + _block(b"DNA1", sdna)[: -len(sdna) // 2],  # DNA1 block cut in the middle.
+        b"BLENDER-v283" + _block(b"DNA1", sdna[:40]),  # DNA1 block of the announced length, with missing structs.
+        gzip.compress(b"BLENDER-v283" + _collection("Rock") + _block(b"DNA1", sdna))[:60],  # Cut gzip stream.
+    ):
+        path.write_bytes(data)
+        with pytest.raises(BlendFileError):
+            read_collection_names(path)
+    assert len(streams) == 2 and all(stream.closed for stream in streams)
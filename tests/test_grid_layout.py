@@ -0,0 +1,71 @@
+from uas_assetbank.grid_layout import GridLayout, index_of_prefix
+
+
+def _layout(item_count=1000):
+    # 4 columns of 100px tiles with 2px padding, 2 rows visible.
+    return GridLayout(item_count, width=2 + 4 * 102 + 12, height=2 + 2 * 102, tile_size=100, padding=2)
+
+
+def test_geometry():
+    layout = _layout()
+    assert layout.columns == 4
+    assert layout.rows == 250
+    assert layout.tile_rect(0) == (2, 104, 100, 100)
+    assert layout.tile_rect(5) == (104, 2, 100, 100)
+    assert layout.visible_range() == (0, 12)
+    assert layout.visible_range(margin_rows=1) == (0, 16)
+
+    first_rect = layout.tile_rect(0)
+    layout.scroll_rows(10, smooth=False)
+    assert layout.visible_range() == (40, 52)
+    assert layout.tile_rect(40) == first_rect
+
+    layout.scroll_to(1e9, smooth=False)
+    assert layout.scroll == layout.max_scroll
+    assert layout.visible_range()[1] == 1000
+
+
+def test_hit_test():
+    layout = _layout()
+    assert layout.hit_test(50, 150) == 0
+    assert layout.hit_test(150, 50) == 5
+    assert layout.hit_test(103, 50) is None  # Padding between tiles.
+    assert layout.hit_test(layout.width - 5, 50) is None  # Scrollbar.
+    layout.scroll_rows(3, smooth=False)
+    assert layout.hit_test(50, 150) == 12
+    for index in range(12, 20):
+        x, y, width, height = layout.tile_rect(index)
+        assert layout.hit_test(x + width / 2, y + height / 2) == index
+
+
+def test_smooth_scroll():
+    layout = _layout()
+    layout.scroll_rows(5)
+    assert layout.scroll == 0 and layout.is_animating
+    steps = 0
+    while layout.animate(1 / 60):
+        steps += 1
+    assert 0 < steps < 60
+    assert layout.scroll == 5 * layout.pitch
+
+
+def test_scrollbar_and_jumps():
+    layout = _layout()
+    assert layout.scrollbar_thumb_rect()[1] + layout.scrollbar_thumb_rect()[3] == layout.height
+    layout.scroll_to_scrollbar(0)
+    assert layout.scroll == layout.max_scroll
+    assert layout.scrollbar_thumb_rect()[1] == 0
+
+    names = sorted(["apple", "banana", "bolt", "crate", "door"])
+    assert index_of_prefix(names, "B") == 1
+    assert index_of_prefix(names, "c") == 3
+    layout.scroll_to_index(index_of_prefix(names, "d"), smooth=False)
+    assert layout.visible_range()[0] == 4
+
+
+def test_resize_keeps_first_item():
+    layout = _layout()
+    layout.scroll_to_index(400, smooth=False)
+    layout.resize(width=2 + 8 * 102 + 12)
+    assert layout.columns == 8
+    assert layout.visible_range()[0] == 400
@@ -0,0 +1,152 @@
+import gzip
+import json
+import multiprocessing
+import ntpath
+import os
+import threading
+import time
+import types
+
+from uas_assetbank import library_format, library_store
+
+
+def test_write_behind(tmp_path, monkeypatch):
+    monkeypatch.setattr(library_store, "quiet_period", 60.0)
+    path = str(tmp_path / "bank.json")
+    with open(path, "w") as f:
+        json.dump({"Rock:props": {"blend_path": "props.blend", "data_name": "Rock"}}, f)
+
+    library_store.update(path, entries={"Tree:props": {"blend_path": "props.blend", "data_name": "Tree"}})
+    library_store.update(path, deleted=["Rock:props"], backup=False)
+    assert set(library_store.load(path)) == {"Tree:props"}
+    with open(path) as f:
+        assert set(json.load(f)) == {"Rock:props"}  # Nothing written yet.
+
+    library_store.flush(path)
+    assert not library_store.has_pending(path)
+    with open(path) as f:
+        assert set(json.load(f)) == {"Tree:props", library_format.HEADER_KEY}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["bank.json", "bank_backups"]
+    assert len(list((tmp_path / "bank_backups").iterdir())) == 1
+
+
+def test_update_during_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(library_store, "quiet_period", 60.0)
+    monkeypatch.setattr(library_store, "settle_delay", 0.5)
+    path = str(tmp_path / "bank.json")
+    library_store.update(path, entries={"Tree:props": {"data_name": "Tree"}}, backup=False)
+    flushing = threading.Thread(target=library_store.flush, args=(path,))
+    flushing.start()
+    time.sleep(0.1)
+
+    start = time.perf_counter()
+    library_store.update(path, entries={"Tree:props": {"data_name": "Tree", "tags": ["wood"]}}, backup=False)
+    library_store.update(path, entries={"Rock:props": {"data_name": "Rock"}}, backup=False)
+    assert set(library_store.load(path)) == {"Tree:props", "Rock:props"}
+    assert time.perf_counter() - start < 0.3  # Not blocked by the flush.
+    flushing.join()
+
+    assert library_store.flush(path) == {}  # Writing over the flushed entry is not a conflict.
+    data = library_format.read(path)
+    assert data["Tree:props"] == {"data_name": "Tree", "tags": ["wood"], "version": 2}
+    assert data["Rock:props"]["version"] == 1
+
+
+def _write_entries(path, writer, count):
+    for i in range(count):
+        library_store.update(path, entries={f"{writer}_{i}:props": {"data_name": f"{writer}_{i}"}}, backup=False)
+        library_store.flush(path)
+
+
+def test_concurrent_writers(tmp_path):
+    path = str(tmp_path / "bank.json")
+    processes = [multiprocessing.Process(target=_write_entries, args=(path, writer, 20)) for writer in range(6)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    data = library_format.read(path)
+    assert set(data) == {f"{writer}_{i}:props" for writer in range(6) for i in range(20)}
+    assert all(entry["version"] == 1 for entry in data.values())
+
+
+def test_conflicts(tmp_path, monkeypatch):
+    monkeypatch.setattr(library_store, "quiet_period", 60.0)
+    path = str(tmp_path / "bank.json")
+    library_store.update(path, entries={"Rock:props": {"data_name": "Rock"}, "Tree:props": {"data_name": "Tree"}})
+    library_store.flush(path)
+
+    # This process reads the library, then someone else modifies both entries before the flush.
+    library_store.update(path, entries={"Rock:props": {"data_name": "Rock", "tags": ["mine"]}}, deleted=["Tree:props"])
+    data = library_format.read(path)
+    for key in data:
+        data[key]["version"] += 1
+    with open(path, "wb") as f:
+        f.write(library_format.encode(path, data))
+
+    assert library_store.flush(path) == {path: ["Rock:props", "Tree:props"]}
+    data = library_format.read(path)
+    assert data["Rock:props"] == {"data_name": "Rock", "tags": ["mine"], "version": 3}
+    assert "Tree:props" in data  # Not deleted, it was modified meanwhile.
+
+
+def test_compressed_library(tmp_path, monkeypatch):
+    monkeypatch.setattr(library_store, "quiet_period", 60.0)
+    path = str(tmp_path / "bank.json.gz")
+    library_store.update(path, entries={"Rock:props": {"data_name": "Rock"}}, backup=False)
+    library_store.flush(path)
+    with gzip.open(path, "rt") as f:
+        assert json.load(f)["Rock:props"] == {"data_name": "Rock", "version": 1}
+
+    library_store.update(path, entries={"Tree:props": {"data_name": "Tree"}})
+    library_store.flush(path)
+    assert set(library_store.load(path)) == {"Rock:props", "Tree:props"}
+    assert len(list((tmp_path / "bank_backups").iterdir())) == 1
+
+
+def test_interned_paths(tmp_path):
+    library_dir = tmp_path / "library"
+    path = str(library_dir / "bank.json")
+    assets_dir = os.path.join(str(library_dir), "props")
+    other_dir = os.path.join(str(tmp_path), "shared")
+    data = {
+        "Rock:rock": {"blend_path": os.path.join(assets_dir, "rock.blend"), "data_name": "Rock"},
+        "Tree:tree": {
+            "blend_path": os.path.join(assets_dir, "tree.blend"),
+            "thumbnail_path": os.path.join(other_dir, "tree.jpg"),
+            "data_name": "Tree",
+        },
+    }
+    raw = json.loads(library_format.encode(path, data))
+    assert raw[library_format.HEADER_KEY]["folders"] == ["./props", other_dir.replace(os.sep, "/")]
+    assert raw["Tree:tree"]["blend_path"] == "@0/tree.blend"
+    assert raw["Tree:tree"]["thumbnail_path"] == "@1/tree.jpg"
+    assert library_format.decode(path, library_format.encode(path, data)) == data
+
+    # The library is moved with its assets.
+    moved_path = str(tmp_path / "moved" / "bank.json")
+    moved = library_format.decode(moved_path, library_format.encode(path, data))
+    assert moved["Rock:rock"]["blend_path"] == os.path.join(str(tmp_path), "moved", "props", "rock.blend")
+    assert moved["Tree:tree"]["thumbnail_path"] == data["Tree:tree"]["thumbnail_path"]
+
+
+def test_interned_paths_windows(monkeypatch):
+    monkeypatch.setattr(library_format, "os", types.SimpleNamespace(path=ntpath, sep=ntpath.sep))
+    path = "C:\\Lib\\bank.json"
+    data = {
+        "Rock:rock": {"blend_path": "C:\\Lib\\Props\\rock.blend", "data_name": "Rock"},
+        "Tree:tree": {
+            "blend_path": "c:\\lib\\tree.blend",
+            "thumbnail_path": "D:\\shared\\tree.jpg",
+            "data_name": "Tree",
+        },
+    }
+    raw = json.loads(library_format.encode(path, data))
+    assert raw[library_format.HEADER_KEY]["folders"] == ["./Props", ".", "D:/shared"]
+
+    moved = library_format.decode("\\\\server\\bank\\bank.json", library_format.encode(path, data))
+    assert moved["Rock:rock"]["blend_path"] == "\\\\server\\bank\\Props\\rock.blend"
+    assert moved["Tree:tree"]["blend_path"] == "\\\\server\\bank\\tree.blend"
+    assert moved["Tree:tree"]["thumbnail_path"] == "D:\\shared\\tree.jpg"
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from uas_assetbank import library_store
+from uas_assetbank import library_watcher
+
+
+def _write(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _watchers():
+    watchers = [library_watcher.StatWatcher()]
+    try:
+        watchers.append(library_watcher.InotifyWatcher(stat_interval=3600.0))
+    except (OSError, AttributeError):
+        pass
+    return watchers
+
+
+@pytest.mark.parametrize("watcher", _watchers(), ids=lambda watcher: type(watcher).__name__)
+def test_changed_libraries(tmp_path, watcher):
+    props = str(tmp_path / "props.json")
+    sets = str(tmp_path / "sets.json")
+    _write(props, "{}")
+    try:
+        watcher.set_paths([props, sets])
+        assert watcher.poll() == set()
+
+        _write(props, '{"Tree:props": {}}')
+        _write(str(tmp_path / "other.json"), "{}")
+        assert watcher.poll() == {props}
+        assert watcher.poll() == set()
+
+        _write(sets, "{}")  # Created after being watched.
+        os.remove(props)
+        assert watcher.poll() == {props, sets}
+
+        watcher.set_paths([sets])
+        _write(props, "{}")
+        assert watcher.poll() == set()
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("watcher", _watchers(), ids=lambda watcher: type(watcher).__name__)
+def test_own_writes(tmp_path, watcher):
+    props = str(tmp_path / "props.json")
+    _write(props, "{}")
+    try:
+        watcher.set_paths([props])
+        library_store.update(props, {"Tree:props": {"data_name": "Tree"}}, backup=False)
+        library_store.flush(props)
+        assert watcher.poll() == set()
+
+        _write(props, "{}")
+        assert watcher.poll() == {props}
+    finally:
+        watcher.close()
@@ -0,0 +1,32 @@
+import os
+import time
+
+from uas_assetbank import source_cache
+
+
+def _source(folder, name, size):
+    path = os.path.join(folder, name)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    return path
+
+
+def test_in_use_copies_are_kept(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = _source(str(tmp_path), "first.blend", 100)
+    second = _source(str(tmp_path), "second.blend", 100)
+    first_copy = source_cache.get_local_copy(first, cache_dir, 150)
+    assert first_copy != first
+    assert source_cache.known_copy(first, cache_dir) == first_copy
+
+    # The first copy is linked by the open file, copying the second one does not evict it and the mirror goes over.
+    source_cache.set_in_use([first_copy])
+    time.sleep(0.01)
+    second_copy = source_cache.get_local_copy(second, cache_dir, 150)
+    assert os.path.exists(first_copy) and os.path.exists(second_copy)
+
+    source_cache.set_in_use([])
+    third = _source(str(tmp_path), "third.blend", 100)
+    source_cache.get_local_copy(third, cache_dir, 150)
+    assert not os.path.exists(first_copy)
+    assert source_cache.known_copy(first, cache_dir) is None
@@ -0,0 +1,18 @@
+from array import array
+
+import pytest
+
+from uas_assetbank.thumbnail_pixels import read_rgba8
+
+
+class _ImagePixels(list):
+    def foreach_get(self, seq):
+        seq[:] = array("i", self)
+
+
+def test_read_rgba8():
+    pixels = [0x11223344, -1, 0, 7, 8, 9]
+    assert list(read_rgba8(_ImagePixels(pixels), 3, 2)) == pixels
+    assert list(read_rgba8(tuple(pixels), 2, 3)) == pixels
+    with pytest.raises(ValueError):
+        read_rgba8(pixels, 2, 2)
@@ -28,9 +28,13 @@ from bpy.props import (
     EnumProperty,
 )
 
+from . import asset_store
+from . import asset_view
 from . import ogl_browser
 from . import plugin_manager
 from . import preferences
+from . import publish_service
+from . import refresh_scheduler
 
 from . import operators
 from . import thumbnails
@@ -65,6 +69,17 @@ else:
 
 
 class UAS_AssetBank_Asset(bpy.types.PropertyGroup):
+    """
+    An asset of the page shown by the list of the panel, copied from its asset_store record.
+    """
+
+    def checked_updated(self, context):
+        if asset_view.filling_window:
+            return
+        asset = asset_store.find(self.identifier)
+        if asset is not None:
+            asset.checked = self.checked
+
     identifier: StringProperty()
     file: StringProperty()
     data_name: StringProperty()
@@ -73,6 +88,8 @@ class UAS_AssetBank_Asset(bpy.types.PropertyGroup):
     nice_name: StringProperty()
     thumbnail_path: StringProperty()
     tags: StringProperty()
+    broken: BoolProperty(default=False)  # The collection is not in the .blend anymore.
+    checked: BoolProperty(default=False, update=checked_updated)  # Picked for a batch import.
 
 
 class UAS_AssetBank_Props(bpy.types.PropertyGroup):
@@ -90,17 +107,38 @@ class UAS_AssetBank_Props(bpy.types.PropertyGroup):
         res.sort(key=lambda x: x[1])
         return res
 
+    def filter_name_updated(self, context):
+        asset_view.invalidate()
+        self.page = 1
+        asset_view.update_window(self)
+        ogl_browser.redraw_overlay(context)
+
+    def page_updated(self, context):
+        asset_view.update_window(self)
+
     def on_toggle_overlay_updated(self, context):
         if self.toggle_overlay:
             bpy.ops.uas.asset_bank_viewport_browser("INVOKE_DEFAULT")
 
     collection: PointerProperty(type=bpy.types.Collection, update=collection_changed)
     selected_index: IntProperty(default=-1)
-    assets: CollectionProperty(type=UAS_AssetBank_Asset)
+    assets: CollectionProperty(type=UAS_AssetBank_Asset)  # The page of the filtered assets shown by the list.
+    page: IntProperty(name="Page", default=1, min=1, update=page_updated)
     initialized: BoolProperty(default=False)
     library: EnumProperty(items=list_libraries)
-    filter_name: StringProperty(options={"TEXTEDIT_UPDATE"})
+    filter_name: StringProperty(options={"TEXTEDIT_UPDATE"}, update=filter_name_updated)
+    filter_invert: BoolProperty(
+        name="Invert", description="Show the assets which do not match the filter", update=filter_name_updated
+    )
+    sort_reverse: BoolProperty(name="Reverse", description="Sort the assets in reverse order", update=filter_name_updated)
     toggle_overlay: BoolProperty(default=False, update=on_toggle_overlay_updated)
+    overlay_height: IntProperty(default=306, min=64)
+    overlay_tile_size: IntProperty(default=150, min=48, max=512)
+    bank_children: BoolProperty(
+        name="Bank Children",
+        description="Bank each child collection of the dropped collection as its own asset",
+        default=False,
+    )
 
 
 classes = (
@@ -124,6 +162,7 @@ def register():
     utils_ui_operators.register()
     ui.register()
     ogl_browser.register()
+    refresh_scheduler.register()
 
     bpy.types.WindowManager.uas_asset_bank = PointerProperty(type=UAS_AssetBank_Props)
     plugin_path = preferences.get_preferences().plugin_path
@@ -136,6 +175,7 @@ def unregister():
     logging.info(f"Unregister {__name__} version {__version__}")
     from . import ui
 
+    refresh_scheduler.unregister()
     ogl_browser.unregister()
     ui.unregister()
     utils_ui_operators.unregister()
@@ -148,6 +188,7 @@ def unregister():
         bpy.utils.unregister_class(cls)
 
     plugin_manager.unregister_plugin()
+    publish_service.shutdown()
     del bpy.types.WindowManager.uas_asset_bank
 
 
@@ -22,23 +22,44 @@ Provides the UAS_AssetBank_Store class which needs to be inherited from in order
 The plugin is python file which needs
 You plugin needs:
  - to inherit from the Operator UAS_AssetBank_Store and override the plugin_execute method.
+   (Optionnal) Override plugin_pre_execute and plugin_execute_batch when banking several collections at once.
  - provide a register/unregister method to register/unregister your operator using the blender api.
  - (Optionnal) Define on_import_post ( scene, newly_created_col_or_instance ) function. It will be called at the end of the import.
+ - (Optionnal) Define on_import_batch_post ( scene, list_of_newly_created_col_or_instance ) function. It will be called once
+   at the end of a mass instancing (see instance_asset). If not defined on_import_post is called for each instance.
 
  Look at the plugin_example folder for an example.
+
+It also provides instance_asset for scripts placing many instances of an asset in one call, and get_publish_pool,
+a pool of background Blender processes plugins can use to write asset files (see publish_service).
 """
 
-__all__ = ["UAS_AssetBank_Store", "EntryData"]
+__all__ = ["UAS_AssetBank_Store", "EntryData", "instance_asset", "get_publish_pool", "PublishError"]
 
 import os
 from dataclasses import dataclass
-from typing import List
+from pathlib import Path
+from typing import Callable, List
 
 import bpy
 
-from .utils import get_thumbnail_path, get_entry_name, add_entry, export_thumbnails
+from .utils import (
+    get_thumbnail_path,
+    get_entry_name,
+    make_entry,
+    list_entries,
+    collection_fingerprint,
+    file_fingerprint,
+    export_collection_thumbnails,
+)
 from . import preferences
+from . import banking_jobs
+from . import library_format
+from . import library_store
 from .thumbnails import reload_thumbnail
+from .operators import add_assets
+from .operators import instance_asset  # noqa: F401 Part of the api.
+from .publish_service import get_pool as get_publish_pool, PublishError  # noqa: F401 Part of the api.
 
 
 @dataclass
@@ -53,6 +74,25 @@ class EntryData:
     thumbnail_path: str = None
     tags: List[str] = None  # Used for filtering in the list view.
     metadata: dict = None  # These are stored in the json but that's all currently ie they are not displayed in the panel nor used.
+    # Optionnal slow work to do before the entry is added, eg writing blend_path with another Blender process.
+    # It runs in a background thread when banking in background so it must not use bpy.
+    publish: Callable[[], None] = None
+    # Optionnal content hash, eg of the published file: the entry is not banked again while it does not change. See
+    # UAS_AssetBank_Store.skip_unchanged.
+    fingerprint: str = None
+
+
+def _same_entry(banked: dict, entry: dict) -> bool:
+    """
+    True if a banked entry holds the same data as a new entry built with make_entry, its version stamp aside.
+    """
+    for key in (set(banked) | set(entry)) - {library_store.VERSION_KEY}:
+        banked_value, value = banked.get(key), entry.get(key)
+        if key in library_format.PATH_FIELDS and banked_value and value:
+            banked_value, value = os.path.normpath(banked_value), os.path.normpath(value)
+        if banked_value != value:
+            return False
+    return True
 
 
 class UAS_AssetBank_Store(bpy.types.Operator):
@@ -82,6 +122,10 @@ class UAS_AssetBank_Store(bpy.types.Operator):
     def __init__(self):
         self._do_backup = True
         self._do_thumbnail = True
+        self._do_save = False
+        self._do_skip_unchanged = None
+        self._collections = list()
+        self._banked_entries = dict()
 
     @property
     def backup(self):
@@ -99,6 +143,61 @@ class UAS_AssetBank_Store(bpy.types.Operator):
     def export_thumbnail(self, value: bool):
         self._do_thumbnail = value
 
+    @property
+    def save_file(self):
+        """
+        Save the scene once before banking, even if the "Save Prior To Bank" preference is off.
+        """
+        return self._do_save
+
+    @save_file.setter
+    def save_file(self, value: bool):
+        self._do_save = value
+
+    @property
+    def skip_unchanged(self):
+        """
+        Do not bank again collections whose fingerprint and entry did not change since they were banked.
+        None by default: only the entries whose fingerprint is given by the plugin (EntryData.fingerprint, eg a hash of
+        the published file) are skipped. The default plugin gives the fingerprint of the banked .blend. Set it to True
+        to also fingerprint the collections without one, from their content (collection_fingerprint, which does not
+        cover everything, eg modifier settings or material nodes), or to False to never skip.
+        """
+        return self._do_skip_unchanged
+
+    @skip_unchanged.setter
+    def skip_unchanged(self, value: bool):
+        self._do_skip_unchanged = value
+
+    def is_unchanged(self, entry_id, fingerprint, blend_path=None, entry: dict = None):
+        """
+        True if the library already has this entry with the same fingerprint (and blend_path if given). If entry, built
+        with make_entry, is given all its fields must be the same too, eg the tags and the thumbnail.
+        Plugins can use it in plugin_execute to skip their own work.
+        """
+        if self._do_skip_unchanged is False or fingerprint is None:
+            return False
+        banked = self._banked_entries.get(entry_id)
+        if banked is None or banked.get("fingerprint") != fingerprint:
+            return False
+        if entry is not None and not _same_entry(banked, entry):
+            return False
+        return blend_path is None or os.path.normpath(banked.get("blend_path", "")) == os.path.normpath(blend_path)
+
+    @property
+    def collections(self) -> List[bpy.types.Collection]:
+        """
+        The collections being banked.
+        """
+        return self._collections
+
+    @property
+    def is_batch(self):
+        """
+        True when several collections are banked at once, eg the children of the dropped collection.
+        """
+        return len(self._collections) > 1
+
     def execute(self, context):
         # This is a bit hacky. But properties being not implemented I prefer to manage the collection here instead of having to redefine it in subclasses.
         collection = context.window_manager.uas_asset_bank.collection
@@ -112,37 +211,104 @@ class UAS_AssetBank_Store(bpy.types.Operator):
         for lib in prefs.libraries:
             if props.library == lib.name:
                 lib_to_bank = lib
-        if prefs.auto_save:
-            bpy.ops.wm.save_as_mainfile(filepath=bpy.data.filepath)
-        entry_data = self.plugin_execute(collection, os.path.dirname(lib_to_bank.path))
 
-        if entry_data.thumbnail_path is None:
-            thumbnail_path = get_thumbnail_path(entry_data.blend_path, entry_data.collection_name)
+        if props.bank_children and len(collection.children):
+            self._collections = list(collection.children)
         else:
-            thumbnail_path = entry_data.thumbnail_path
+            self._collections = [collection]
+
+        # Loaded before the plugin so that it can use is_unchanged.
+        self._banked_entries = dict()
+        if self._do_skip_unchanged is not False:
+            self._banked_entries = dict(list_entries(lib_to_bank.path))
+
+        # A batch is saved, written and refreshed once.
+        self.plugin_pre_execute(self._collections)
+        if prefs.auto_save or self._do_save:
+            bpy.ops.wm.save_as_mainfile(filepath=bpy.data.filepath)
+        entries_data = self.plugin_execute_batch(self._collections, os.path.dirname(lib_to_bank.path))
+
+        entries = dict()
+        thumbnails = list()
+        publish = list()
+        unchanged = list()
+        for entry_data, banked_collection in zip(entries_data, self._collections):
+            if entry_data.thumbnail_path is None:
+                thumbnail_path = get_thumbnail_path(entry_data.blend_path, entry_data.collection_name)
+            else:
+                thumbnail_path = entry_data.thumbnail_path
+
+            entry_id = get_entry_name(entry_data.collection_name, entry_data.blend_path)
+            fingerprint = entry_data.fingerprint
+            if fingerprint is None and self._do_skip_unchanged:
+                fingerprint = collection_fingerprint(banked_collection)
+            entry = make_entry(
+                entry_data.collection_name,
+                entry_data.blend_path,
+                entry_data.thumbnail_path,
+                tags=entry_data.tags,
+                metadata=entry_data.metadata,
+                fingerprint=fingerprint,
+            )
+            unchanged_entry = self.is_unchanged(entry_id, fingerprint, entry_data.blend_path, entry)
+            if unchanged_entry and Path(thumbnail_path).is_file():
+                unchanged.append(entry_data.collection_name)
+                continue
+
+            entries[entry_id] = entry
+            thumbnails.append((thumbnail_path, banked_collection))
+            if entry_data.publish is not None:
+                publish.append(entry_data.publish)
+
+        context.window_manager.uas_asset_bank.collection = None  # clear the property in order to clear the ui.
+        if not entries:
+            self.report({"INFO"}, f"Nothing to bank, {', '.join(unchanged)} did not change.")
+            return {"FINISHED"}
+        if unchanged:
+            self.report({"INFO"}, f"Skipped {len(unchanged)} unchanged collections.")
+
+        if self._do_thumbnail:
+            export_collection_thumbnails(context, thumbnails, prefs.thumbnails_resolution)
 
-        entry_id = get_entry_name(entry_data.collection_name, entry_data.blend_path)
-        add_entry(
+        # Everything needing Blender is done, the publish and the library write can be deferred.
+        job = banking_jobs.BankingJob(
+            props.library,
             lib_to_bank.path,
-            entry_id,
-            entry_data.collection_name,
-            entry_data.blend_path,
-            entry_data.thumbnail_path,
-            tags=entry_data.tags,
-            metadata=entry_data.metadata,
+            entries,
+            publish=publish,
             backup=self.backup,
         )
+        if prefs.background_banking:
+            banking_jobs.submit(job)
+            self.report({"INFO"}, f"Banking {job.label} in background.")
+            return {"FINISHED"}
 
-        if self._do_thumbnail:
-            export_thumbnails(context, thumbnail_path, prefs.thumbnails_resolution)
-        reload_thumbnail(props.library, entry_id)
-
-        bpy.ops.uas.asset_bank_refresh()
-        context.window_manager.uas_asset_bank.collection = None  # clear the property in order to clear the ui.
-        self.report({"INFO"}, f"Successfully Banked {entry_data.collection_name}.")
+        job.run()
+        for entry_id in entries:
+            reload_thumbnail(props.library, entry_id)
+        add_assets(context, props.library, entries)
+        self.report({"INFO"}, f"Successfully Banked {job.label}.")
 
         return {"FINISHED"}
 
+    def plugin_pre_execute(self, collections: List[bpy.types.Collection]):
+        """
+        Called once before the scene is saved and the collections processed, eg to rename the collections.
+        Does nothing by default.
+
+        :param collections: The collections about to be banked.
+        """
+        pass
+
+    def plugin_execute_batch(self, collections: List[bpy.types.Collection], library_dir: str) -> List[EntryData]:
+        """
+        Process all the banked collections. Calls plugin_execute for each collection by default, override it if your
+        plugin can process several collections at once more efficiently.
+
+        :return: One EntryData per collection, in the same order.
+        """
+        return [self.plugin_execute(collection, library_dir) for collection in collections]
+
     def plugin_execute(self, collection: bpy.types.Collection, library_dir: str) -> EntryData:
         """
         Takes in the collection chosed by the user.
@@ -154,4 +320,5 @@ class UAS_AssetBank_Store(bpy.types.Operator):
         :param library_dir: Directory containing the database (json). Can be usefull if you need to put files in the same directory.
         :return: An Entry_data.
         """
-        return EntryData(collection.name, bpy.data.filepath)
+        # The entry points to the collection in the current file: it did not change as long as the file did not.
+        return EntryData(collection.name, bpy.data.filepath, fingerprint=file_fingerprint(bpy.data.filepath))
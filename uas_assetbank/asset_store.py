@@ -0,0 +1,182 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+The assets of the enabled libraries, as plain python records.
+
+This is the reference list of assets. The WindowManager uas_asset_bank.assets collection only holds the page of the
+filtered assets shown by the list in the panel, see asset_view.update_window. Operators address assets by identifier:
+the assets and the paths of their libraries are kept in maps by identifier, updated when assets are added or removed.
+An identifier is expected to be unique among the enabled libraries, the map holds the asset of the first library, in
+the order of the preferences, otherwise. Removing it makes the asset of the next library the one found.
+
+This module does not use bpy.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class AssetRecord:
+    __slots__ = ("identifier", "library", "file", "data_name", "thumbnail_path", "tags", "broken", "checked")
+
+    def __init__(self, identifier, library, file, data_name, thumbnail_path="", tags=""):
+        self.identifier = identifier
+        self.library = library
+        self.file = file
+        self.data_name = data_name
+        self.thumbnail_path = thumbnail_path
+        self.tags = tags
+        self.broken = False  # The collection is not in the .blend anymore.
+        self.checked = False  # Picked for a batch import.
+
+    def has_same_data(self, other) -> bool:
+        return (
+            self.identifier == other.identifier
+            and self.library == other.library
+            and self.file == other.file
+            and self.data_name == other.data_name
+            and self.thumbnail_path == other.thumbnail_path
+            and self.tags == other.tags
+        )
+
+    @property
+    def nice_name(self):
+        return f"{self.data_name}::{Path(self.file).name}"
+
+
+assets: List[AssetRecord] = list()
+_by_identifier: Dict[str, AssetRecord] = dict()
+_by_key: Dict[Tuple[str, str], AssetRecord] = dict()  # (identifier, library name) -> asset
+_library_paths: Dict[str, str] = dict()  # asset identifier -> path of its library
+_libraries: Dict[str, str] = dict()  # library name -> library path, of the libraries the assets were loaded from
+
+
+def _rank(library_name) -> int:
+    """
+    Priority of a library among the loaded libraries, lower first.
+    """
+    try:
+        return list(_libraries).index(library_name)
+    except ValueError:
+        return len(_libraries)
+
+
+def set_assets(records: List[AssetRecord], library_paths: Dict[str, str]):
+    """
+    Replace all the assets. They are kept in the order of their libraries.
+
+    :param library_paths: library name -> library path, for the libraries of the records, in the preferences order.
+    """
+    ranks = {name: rank for rank, name in enumerate(library_paths)}
+    assets[:] = sorted(records, key=lambda asset: ranks.get(asset.library, len(ranks)))
+    _by_identifier.clear()
+    _by_key.clear()
+    _library_paths.clear()
+    _libraries.clear()
+    _libraries.update(library_paths)
+    for asset in assets:
+        _by_key[(asset.identifier, asset.library)] = asset
+        if asset.identifier not in _by_identifier:
+            _by_identifier[asset.identifier] = asset
+            _library_paths[asset.identifier] = library_paths.get(asset.library, "")
+
+
+def loaded_libraries() -> Dict[str, str]:
+    """
+    Name -> path of the libraries the assets were loaded from, see set_assets.
+    """
+    return dict(_libraries)
+
+
+def library_assets(library_name) -> List[AssetRecord]:
+    return [asset for asset in assets if asset.library == library_name]
+
+
+def find(identifier) -> Optional[AssetRecord]:
+    return _by_identifier.get(identifier)
+
+
+def library_path(identifier) -> Optional[str]:
+    """
+    Path of the library holding an asset, None if there is no such asset.
+    """
+    return _library_paths.get(identifier)
+
+
+def put(asset: AssetRecord, library_path) -> Optional[AssetRecord]:
+    """
+    Add an asset, or replace the asset with the same identifier in the same library which then keeps its place.
+    Return the replaced asset.
+    """
+    key = (asset.identifier, asset.library)
+    previous = _by_key.get(key)
+    if previous is None:
+        assets.append(asset)
+    else:
+        asset.checked = previous.checked
+        assets[assets.index(previous)] = asset
+    _by_key[key] = asset
+    found = _by_identifier.get(asset.identifier)
+    if found is None or found is previous or _rank(asset.library) < _rank(found.library):
+        _by_identifier[asset.identifier] = asset
+        _library_paths[asset.identifier] = library_path
+    return previous
+
+
+def remove(identifier, library_name=None) -> Optional[AssetRecord]:
+    """
+    Remove the asset found for an identifier, or the one of a library. Return it, or None if there was no such asset.
+    """
+    if library_name is None:
+        asset = _by_identifier.get(identifier)
+    else:
+        asset = _by_key.get((identifier, library_name))
+    if asset is None:
+        return None
+    del _by_key[(identifier, asset.library)]
+    assets.remove(asset)
+    if _by_identifier[identifier] is asset:
+        # The asset of the next library with this identifier is found now.
+        others = [other for other in assets if other.identifier == identifier]
+        if others:
+            found = min(others, key=lambda other: _rank(other.library))
+            _by_identifier[identifier] = found
+            _library_paths[identifier] = _libraries.get(found.library, "")
+        else:
+            del _by_identifier[identifier]
+            del _library_paths[identifier]
+    return asset
+
+
+def checked_assets() -> List[AssetRecord]:
+    return [asset for asset in assets if asset.checked]
+
+
+def copy_to_item(asset: AssetRecord, item):
+    """
+    Copy a record into a UAS_AssetBank_Asset.
+    """
+    item.identifier = asset.identifier
+    item.library = asset.library
+    item.file = asset.file
+    item.data_name = asset.data_name
+    item.nice_name = asset.nice_name
+    item.thumbnail_path = asset.thumbnail_path
+    item.tags = asset.tags
+    item.broken = asset.broken
+    item.checked = asset.checked
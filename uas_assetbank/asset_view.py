@@ -0,0 +1,223 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Filtered and sorted view of the assets, shared by the list of the panel and the viewport overlay.
+
+The view is computed again only when the revision changes: invalidate() is called when the assets are refreshed and
+when the filter changes. The filter can be inverted and the sort order reversed, from the toggles of the list. Showing a page is then a slice of the view. Assets added or removed one by one are inserted
+into, or removed from, the view in place.
+
+The list of the panel shows one page of WINDOW_SIZE assets of the view at a time: only these are copied into the
+uas_asset_bank.assets collection, see update_window. The assets themselves are the records of asset_store.
+"""
+
+import bisect
+import math
+from typing import List
+
+from . import asset_store
+from .grid_layout import index_of_prefix
+from .utils import asset_match_filter
+
+WINDOW_SIZE = 200
+
+revision = 0
+
+
+def invalidate():
+    global revision
+    revision += 1
+
+
+class AssetView:
+    def __init__(self):
+        self.assets: List[asset_store.AssetRecord] = list()  # Sorted by name.
+        self.names: List[str] = list()  # Their lower case names, to search by name.
+        self.filter_name = ""
+        self.invert = False  # Show the assets which do not match the filter.
+        self.reverse = False  # Sorted by descending names.
+        self._revision = None
+
+    @property
+    def built_revision(self):
+        """
+        The revision the view was computed at, to know whether a view shared with others changed.
+        """
+        return self._revision
+
+    def __len__(self):
+        return len(self.assets)
+
+    @property
+    def is_stale(self):
+        return self._revision != revision
+
+    def update(self, assets, filter_name, invert=False, reverse=False) -> bool:
+        """
+        Compute the view again if it is stale. Return True if it was.
+        """
+        if not self.is_stale:
+            return False
+        self.filter_name = filter_name
+        self.invert = invert
+        self.reverse = reverse
+        indexed = [(asset.data_name.lower(), i) for i, asset in enumerate(assets) if self._matches(asset)]
+        indexed.sort(reverse=reverse)
+        self.assets = [assets[i] for _name, i in indexed]
+        self.names = [name for name, _i in indexed]
+        self._revision = revision
+        return True
+
+    def _matches(self, asset) -> bool:
+        filters = self.filter_name.strip().lower().split()
+        if not filters:
+            return True
+        return bool(asset_match_filter(asset, filters, 1)) != self.invert
+
+    def _bisect(self, name, right) -> int:
+        if not self.reverse:
+            return (bisect.bisect_right if right else bisect.bisect_left)(self.names, name)
+        # bisect only handles ascending lists.
+        low, high = 0, len(self.names)
+        while low < high:
+            middle = (low + high) // 2
+            if self.names[middle] > name or (right and self.names[middle] == name):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def index_of_prefix(self, prefix) -> int:
+        """
+        Position of the first asset whose name starts with prefix, or following it in the sort order.
+        """
+        if not self.reverse:
+            return index_of_prefix(self.names, prefix)
+        prefix = prefix.lower()
+        return self._bisect(prefix[:-1] + chr(ord(prefix[-1]) + 1), right=True)
+
+    def _changed(self):
+        global revision
+        revision += 1
+        self._revision = revision
+
+    def insert(self, asset) -> bool:
+        """
+        Add an asset to an up to date view, if it matches the filter. Return True if it was added.
+        """
+        if self.is_stale or not self._matches(asset):
+            return False
+        name = asset.data_name.lower()
+        position = self._bisect(name, right=True)
+        self.names.insert(position, name)
+        self.assets.insert(position, asset)
+        self._changed()
+        return True
+
+    def remove(self, asset) -> bool:
+        """
+        Remove an asset from an up to date view. Return True if it was in it.
+        """
+        if self.is_stale:
+            return False
+        name = asset.data_name.lower()
+        position = self._bisect(name, right=False)
+        while position < len(self.names) and self.names[position] == name:
+            if self.assets[position] is asset:
+                del self.names[position]
+                del self.assets[position]
+                self._changed()
+                return True
+            position += 1
+        return False
+
+    def slice(self, start, count) -> List[asset_store.AssetRecord]:
+        return self.assets[max(0, start) : max(0, start + count)]
+
+
+view = AssetView()
+
+filling_window = False  # Set while the window is filled, the update callbacks of its items are then ignored.
+_window_key = None  # (view revision, page) the window was filled for.
+
+
+def current_view(props) -> AssetView:
+    view.update(asset_store.assets, props.filter_name, props.filter_invert, props.sort_reverse)
+    return view
+
+
+def page_count(props):
+    return max(1, math.ceil(len(current_view(props)) / WINDOW_SIZE))
+
+
+def update_window(props, force=False):
+    """
+    Fill the uas_asset_bank.assets collection with the current page of the view, unless it already holds it. The
+    selected asset stays selected when it is still in the page.
+    """
+    global _window_key, filling_window
+    page = min(max(props.page, 1), page_count(props))
+    if page != props.page:
+        props.page = page  # Its update callback fills the window.
+        return
+    key = (view.built_revision, page)
+    if key == _window_key and not force:
+        return
+    _window_key = key
+
+    window = props.assets
+    selected = window[props.selected_index].identifier if 0 <= props.selected_index < len(window) else None
+    filling_window = True
+    try:
+        window.clear()
+        selected_index = -1
+        for i, asset in enumerate(view.slice((page - 1) * WINDOW_SIZE, WINDOW_SIZE)):
+            asset_store.copy_to_item(asset, window.add())
+            if asset.identifier == selected:
+                selected_index = i
+    finally:
+        filling_window = False
+    props.selected_index = selected_index
+
+
+def sync_window(props):
+    """
+    Copy the flags of the assets into the window, after they changed in the store.
+    """
+    global filling_window
+    if _window_key != (current_view(props).built_revision, props.page):
+        update_window(props)
+        return
+    filling_window = True
+    try:
+        for item, asset in zip(props.assets, view.slice((props.page - 1) * WINDOW_SIZE, WINDOW_SIZE)):
+            item.broken = asset.broken
+            item.checked = asset.checked
+    finally:
+        filling_window = False
+
+
+def select_position(props, position):
+    """
+    Show the page of a position of the view in the list and select it there.
+    """
+    page = position // WINDOW_SIZE + 1
+    if page != props.page:
+        props.page = page
+    update_window(props)
+    props.selected_index = position % WINDOW_SIZE
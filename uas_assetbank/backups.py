@@ -0,0 +1,212 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Rotating compressed backups of the json libraries.
+
+Backups of a library are kept in a "<library name>_backups" folder next to it. The library store asks for a backup
+before writing a library, a backup point is made at most once per interval seconds and only the keep most recent
+points are kept. A point is either a full snapshot or, when few entries changed since the last full snapshot, a delta
+from it. Points are compressed with gzip or lzma.
+
+This module does not use bpy, backups happen in the library store flush thread.
+"""
+
+import gzip
+import json
+import lzma
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from . import library_format
+
+FULL = "full"
+DELTA = "delta"
+
+_compressors = {"GZIP": (gzip, ".gz"), "LZMA": (lzma, ".xz")}
+_openers = {".gz": gzip.open, ".xz": lzma.open}
+
+# Settings, see configure.
+interval = 600.0  # seconds
+keep = 10
+compression = "GZIP"
+delta_ratio = 0.25  # A delta is made when it holds less than this ratio of the base snapshot entries.
+
+
+@dataclass
+class BackupPoint:
+    id: str  # "<timestamp>-<kind>", sorts in time order
+    kind: str  # FULL or DELTA
+    time: float
+    path: Path
+
+    @property
+    def label(self):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.time)) + ("" if self.kind == FULL else " (delta)")
+
+
+def configure(interval_seconds=None, keep_count=None, compression_name=None):
+    global interval, keep, compression
+    if interval_seconds is not None:
+        interval = float(interval_seconds)
+    if keep_count is not None:
+        keep = max(1, int(keep_count))
+    if compression_name is not None:
+        if compression_name not in _compressors:
+            raise ValueError(f"Unknown backup compression {compression_name}.")
+        compression = compression_name
+
+
+def backup_dir(library_path) -> Path:
+    library_path = Path(library_path)
+    name = library_path.name
+    for suffix in library_format.SUFFIXES:
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return library_path.parent.joinpath(f"{name}_backups")
+
+
+def list_points(library_path) -> List[BackupPoint]:
+    """
+    The backup points of a library, most recent first.
+    """
+    directory = backup_dir(library_path)
+    if not directory.is_dir():
+        return list()
+    points = list()
+    for path in directory.iterdir():
+        name, dot, extension = path.name.partition(".json")
+        if not dot or extension not in _openers:
+            continue
+        timestamp, _, kind = name.partition("-")
+        if kind not in (FULL, DELTA) or not timestamp.isdigit():
+            continue
+        points.append(BackupPoint(id=name, kind=kind, time=int(timestamp) / 1e6, path=path))
+    points.sort(key=lambda point: point.id, reverse=True)
+    return points
+
+
+def _read_point(point: BackupPoint) -> dict:
+    with _openers[point.path.name[point.path.name.rindex(".") :]](point.path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_point(directory: Path, kind, content) -> BackupPoint:
+    module, extension = _compressors[compression]
+    now = time.time()
+    point_id = f"{int(now * 1e6)}-{kind}"
+    path = directory.joinpath(f"{point_id}.json{extension}")
+    tmp_path = directory.joinpath(f"{point_id}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with module.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(content, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            os.remove(tmp_path)
+    return BackupPoint(id=point_id, kind=kind, time=now, path=path)
+
+
+def _latest_full(points) -> Optional[BackupPoint]:
+    return next((point for point in points if point.kind == FULL), None)
+
+
+def load_point(library_path, point_id) -> dict:
+    """
+    Return the library content saved by a backup point.
+    """
+    points = list_points(library_path)
+    point = next((point for point in points if point.id == point_id), None)
+    if point is None:
+        raise FileNotFoundError(f"No backup point {point_id} for {library_path}.")
+    content = _read_point(point)
+    if point.kind == FULL:
+        return content
+    base = next((p for p in points if p.id == content["base"]), None)
+    if base is None:
+        raise FileNotFoundError(f"The snapshot {content['base']} of the backup point {point_id} is missing.")
+    data = _read_point(base)
+    for key in content["deleted"]:
+        data.pop(key, None)
+    data.update(content["entries"])
+    return data
+
+
+def _rotate(points: List[BackupPoint]):
+    """
+    Remove the points beyond the keep most recent ones, except the snapshots the kept deltas are made from.
+    """
+    kept = points[:keep]
+    needed = set()
+    for point in kept:
+        if point.kind == DELTA:
+            try:
+                needed.add(_read_point(point)["base"])
+            except (OSError, ValueError, KeyError):
+                pass
+    for point in points[keep:]:
+        if point.id not in needed:
+            try:
+                os.remove(point.path)
+            except OSError:
+                pass
+
+
+def backup(library_path, force=False) -> Optional[BackupPoint]:
+    """
+    Make a backup point of the current content of a library, unless the last one is less than interval seconds old or
+    the library did not change since. Return the new point, if any.
+    """
+    library_path = Path(library_path)
+    if not library_path.is_file():
+        return None
+    points = list_points(library_path)
+    if not force and points and time.time() - points[0].time < interval:
+        return None
+
+    data = library_format.read(library_path)
+
+    directory = backup_dir(library_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    point = None
+    base = _latest_full(points)
+    if base is not None:
+        try:
+            base_data = _read_point(base)
+        except (OSError, ValueError):
+            base_data = None
+        if base_data is not None:
+            entries = {key: entry for key, entry in data.items() if base_data.get(key) != entry}
+            deleted = [key for key in base_data if key not in data]
+            latest = points[0]
+            if latest.kind == FULL and not entries and not deleted:
+                return None
+            if len(entries) + len(deleted) <= delta_ratio * len(base_data):
+                delta = {"base": base.id, "entries": entries, "deleted": deleted}
+                if latest.kind == DELTA and _read_point(latest) == delta:
+                    return None
+                point = _write_point(directory, DELTA, delta)
+    if point is None:
+        point = _write_point(directory, FULL, data)
+
+    _rotate(list_points(library_path))
+    return point
@@ -0,0 +1,175 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Banking job queue.
+
+The banking operator does what needs Blender synchronously (saving, collecting the entries, thumbnails) and hands
+the slow part to a job: the plugins publish callables (eg writing the asset file with another Blender process) and the
+library write. Jobs run one at a time in a background thread, in submission order, so library writes keep their order.
+A timer on the main thread refreshes the ui when jobs are done. Failed jobs are kept so they can be retried.
+"""
+
+import itertools
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+
+import bpy
+
+from .utils import add_entries
+from .thumbnails import reload_thumbnail
+
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+_ids = itertools.count(1)
+
+
+@dataclass
+class BankingJob:
+    library_name: str
+    library_path: str
+    entries: Dict[str, dict]  # entry key -> entry built with utils.make_entry
+    publish: List[Callable[[], None]] = field(default_factory=list)  # Run before writing the library. No bpy here.
+    backup: bool = True
+    status: str = PENDING
+    error: str = ""
+    id: int = field(default_factory=lambda: next(_ids))
+
+    @property
+    def label(self):
+        names = [entry["data_name"] for entry in self.entries.values()]
+        return names[0] if len(names) == 1 else f"{len(names)} assets"
+
+    def run(self):
+        if len(self.publish) == 1:
+            self.publish[0]()
+        elif self.publish:
+            # Publish callables are independent, eg a batch can be spread over the workers of a publish pool.
+            with ThreadPoolExecutor(max_workers=min(8, len(self.publish))) as executor:
+                list(executor.map(lambda publish: publish(), self.publish))
+        add_entries(self.library_path, self.entries, backup=self.backup)
+
+
+jobs = list()  # All the jobs not yet collected by the main thread, including the failed ones.
+_queue = queue.Queue()
+_worker = None
+# Queued by stop(): the worker stops when it gets it, ie once it ran the jobs queued before, unless a job was submitted
+# or stop() called again meanwhile.
+_stop_token = None
+_lock = threading.Lock()
+
+
+def _work():
+    global _worker
+    while True:
+        job = _queue.get()
+        if not isinstance(job, BankingJob):
+            with _lock:
+                if job is _stop_token:
+                    _worker = None
+                    break
+            continue
+        job.status = RUNNING
+        try:
+            job.run()
+            job.status = DONE
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e) or type(e).__name__
+            job.status = FAILED
+
+
+def _collect_jobs():
+    """
+    Main thread timer: refresh once for all the finished jobs.
+    """
+    with _lock:
+        done = [job for job in jobs if job.status == DONE]
+        for job in done:
+            jobs.remove(job)
+        running = any(job.status in (PENDING, RUNNING) for job in jobs)
+
+    if done:
+        from .operators import add_assets  # The operators module imports this one.
+
+        for job in done:
+            for entry_id in job.entries:
+                reload_thumbnail(job.library_name, entry_id)
+            add_assets(bpy.context, job.library_name, job.entries)
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
+
+    return 0.5 if running else None
+
+
+def submit(job: BankingJob):
+    global _worker, _stop_token
+    with _lock:
+        if job not in jobs:
+            jobs.append(job)
+        job.status = PENDING
+        job.error = ""
+        # A worker asked to stop but still running keeps going, so that there is never two workers reading the queue.
+        _stop_token = None
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_work, name="uas_assetbank_banking", daemon=True)
+            _worker.start()
+        _queue.put(job)
+    if not bpy.app.timers.is_registered(_collect_jobs):
+        bpy.app.timers.register(_collect_jobs, first_interval=0.5)
+
+
+def find_job(job_id):
+    for job in jobs:
+        if job.id == job_id:
+            return job
+    return None
+
+
+def retry(job_id):
+    job = find_job(job_id)
+    if job is not None and job.status == FAILED:
+        submit(job)
+
+
+def dismiss(job_id):
+    job = find_job(job_id)
+    if job is not None and job.status == FAILED:
+        with _lock:
+            jobs.remove(job)
+
+
+def stop():
+    """
+    Stop the worker once it ran the jobs already submitted. It does not wait for them.
+    """
+    global _stop_token
+    with _lock:
+        if _worker is not None:
+            _stop_token = object()
+            _queue.put(_stop_token)
+    if bpy.app.timers.is_registered(_collect_jobs):
+        bpy.app.timers.unregister(_collect_jobs)
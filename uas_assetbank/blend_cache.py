@@ -0,0 +1,106 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Cache of the collection names contained in the banked .blend files.
+
+Entries are keyed by path and validated against the file mtime and size. The cache is filled in background threads
+with the pure python blend reader, so it can be used to detect broken entries without opening the files in Blender.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import FrozenSet, Iterable
+
+from . import blend_reader
+
+_cache = dict()  # path -> (mtime_ns, size, frozenset of collection names)
+_lock = threading.Lock()
+_executor = None
+
+
+def _file_key(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def cached_collection_names(path) -> FrozenSet[str]:
+    """
+    Return the collection names of a .blend if they are cached and up to date, None otherwise. Never reads the file.
+    """
+    key = _file_key(path)
+    with _lock:
+        entry = _cache.get(path)
+    if key is None or entry is None or entry[:2] != key:
+        return None
+    return entry[2]
+
+
+def get_collection_names(path) -> FrozenSet[str]:
+    """
+    Return the collection names of a .blend, reading its blocks if the cache is outdated.
+    None if the file does not exist or cannot be read.
+    """
+    key = _file_key(path)
+    if key is None:
+        return None
+    with _lock:
+        entry = _cache.get(path)
+    if entry is not None and entry[:2] == key:
+        return entry[2]
+
+    try:
+        names = frozenset(blend_reader.read_collection_names(path))
+    except (OSError, blend_reader.BlendFileError) as e:
+        print(f"Could not list collections of {path}: {e}")
+        return None
+    with _lock:
+        _cache[path] = (key[0], key[1], names)
+    return names
+
+
+def has_collection(path, collection_name):
+    """
+    True or False if the cache knows whether the collection is in the .blend, None when it does not know (yet).
+    """
+    names = cached_collection_names(path)
+    if names is None:
+        return None
+    return collection_name in names
+
+
+def prefetch(paths: Iterable[str]):
+    """
+    Fill the cache in the background for the given .blend files. Return the list of futures.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="uas_assetbank_blend_cache")
+    return [_executor.submit(get_collection_names, path) for path in set(paths)]
+
+
+def clear():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    with _lock:
+        _cache.clear()
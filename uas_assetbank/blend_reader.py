@@ -0,0 +1,355 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Minimal pure python .blend reader.
+
+It only knows how to walk the file blocks and to decode the few structs needed by the addon (collection names and
+their embedded previews), without starting Blender. It does not import bpy so it can be used from worker threads.
+
+File layout reminder:
+ - a 12 bytes header: "BLENDER", pointer size ('_' = 4, '-' = 8), endianness ('v' little, 'V' big) and version.
+ - a list of blocks, each one starting with a BHead (code, length, old pointer, SDNA index, count).
+ - the DNA1 block describing all the structs, usually written last, and an ENDB block.
+
+The preview of an ID is written as a PreviewImage DATA block right after the ID block, followed by the raw pixels
+of each preview size.
+"""
+
+import gzip
+import io
+import re
+import struct
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+CODE_COLLECTION = b"GR\x00\x00"
+CODE_DATA = b"DATA"
+CODE_DNA = b"DNA1"
+CODE_END = b"ENDB"
+
+
+class BlendFileError(Exception):
+    pass
+
+
+# What a truncated or corrupted file raises while it is parsed.
+_CORRUPT_ERRORS = (struct.error, ValueError, IndexError, KeyError, EOFError, zlib.error)
+
+
+@contextmanager
+def _corrupt_file_errors(path):
+    """
+    Raise the errors of a truncated or corrupted file as BlendFileError.
+    """
+    try:
+        yield
+    except _CORRUPT_ERRORS as e:
+        raise BlendFileError(f"{path} is truncated or corrupted: {e}") from e
+
+
+@dataclass
+class BlendPreview:
+    """
+    An embedded preview. Pixels are 8 bits RGBA, rows stored bottom to top as in Blender.
+    """
+
+    width: int
+    height: int
+    pixels: bytes
+
+    def to_png(self) -> bytes:
+        """
+        Encode the preview as a png (top to bottom rows as expected by image viewers).
+        """
+        row_size = self.width * 4
+        raw = bytearray()
+        for y in reversed(range(self.height)):
+            raw.append(0)  # No filter for this scanline.
+            raw += self.pixels[y * row_size : (y + 1) * row_size]
+
+        def chunk(tag, data):
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+        header = struct.pack(">IIBBBBB", self.width, self.height, 8, 6, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+            + chunk(b"IEND", b"")
+        )
+
+
+def _open_decompressed(path):
+    """
+    Return a seekable binary stream on the uncompressed content of a .blend.
+    Compressed files are inflated in memory since the blocks are read in two passes, plain files are read in place
+    so that indexing them only touches the block headers.
+    """
+    f = open(path, "rb")
+    magic = f.read(4)
+    f.seek(0)
+    if magic[:2] == GZIP_MAGIC:
+        with f, gzip.GzipFile(fileobj=f) as gz:
+            return io.BytesIO(gz.read())
+    if magic == ZSTD_MAGIC:
+        f.close()
+        try:
+            import zstandard
+        except ImportError:
+            raise BlendFileError(f"{path} is zstd compressed and the zstandard module is not available.")
+        try:
+            with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as reader:
+                return io.BytesIO(reader.read())
+        except zstandard.ZstdError as e:
+            raise BlendFileError(f"{path} is truncated or corrupted: {e}") from e
+    return f
+
+
+class _SDNA:
+    """
+    Struct descriptions stored in the DNA1 block. Only what is needed to compute field offsets is kept.
+    """
+
+    def __init__(self, data: bytes, endian: str, pointer_size: int):
+        self.pointer_size = pointer_size
+        pos = 8  # "SDNA" "NAME"
+
+        def read_int():
+            nonlocal pos
+            value = struct.unpack_from(endian + "i", data, pos)[0]
+            pos += 4
+            return value
+
+        def read_strings(count):
+            nonlocal pos
+            res = list()
+            for _ in range(count):
+                end = data.index(b"\x00", pos)
+                res.append(data[pos:end].decode("ascii", errors="replace"))
+                pos = end + 1
+            return res
+
+        def align():
+            nonlocal pos
+            pos = (pos + 3) & ~3
+
+        names = read_strings(read_int())
+        align()
+        pos += 4  # "TYPE"
+        types = read_strings(read_int())
+        align()
+        pos += 4  # "TLEN"
+        lengths = struct.unpack_from(endian + f"{len(types)}h", data, pos)
+        pos += 2 * len(types)
+        align()
+        pos += 4  # "STRC"
+        self.structs = dict()  # sdna index -> (type name, list of (field name, offset, size))
+        self.struct_index = dict()  # type name -> sdna index
+        for sdna_index in range(read_int()):
+            type_index, field_count = struct.unpack_from(endian + "hh", data, pos)
+            pos += 4
+            fields = list()
+            offset = 0
+            for _ in range(field_count):
+                field_type, field_name = struct.unpack_from(endian + "hh", data, pos)
+                pos += 4
+                name = names[field_name]
+                size = self._field_size(name, lengths[field_type])
+                fields.append((re.sub(r"[\*\(\)\[\]\d]", "", name), offset, size))
+                offset += size
+            self.structs[sdna_index] = (types[type_index], fields)
+            self.struct_index[types[type_index]] = sdna_index
+
+    def _field_size(self, name, type_length):
+        if name.startswith("(*"):
+            return self.pointer_size
+        size = self.pointer_size if name.startswith("*") else type_length
+        for dim in re.findall(r"\[(\d+)\]", name):
+            size *= int(dim)
+        return size
+
+    def field(self, type_name, field_name):
+        """
+        Return the offset and size of a field of a struct.
+        """
+        _type, fields = self.structs[self.struct_index[type_name]]
+        for name, offset, size in fields:
+            if name == field_name:
+                return offset, size
+        raise BlendFileError(f"{type_name}.{field_name} not found in file DNA.")
+
+
+class BlendFile:
+    """
+    Index of the blocks of a .blend file. Only block headers are read at construction, block contents are read on demand.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        with _corrupt_file_errors(self.path):
+            self._stream = _open_decompressed(path)
+        try:
+            with _corrupt_file_errors(self.path):
+                self._read_blocks()
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_blocks(self):
+        header = self._stream.read(12)
+        if len(header) != 12 or not header.startswith(b"BLENDER"):
+            raise BlendFileError(f"{self.path} is not a .blend file.")
+
+        self.pointer_size = 8 if header[7:8] == b"-" else 4
+        self.endian = "<" if header[8:9] == b"v" else ">"
+        self.version = header[9:12].decode("ascii", errors="replace")
+        self._bhead = struct.Struct(self.endian + ("4siQii" if self.pointer_size == 8 else "4siIii"))
+
+        self.blocks = list()  # List of (code, sdna index, data offset, data length)
+        sdna_block = None
+        while True:
+            raw = self._stream.read(self._bhead.size)
+            if len(raw) < self._bhead.size:
+                break
+            code, length, _old, sdna_index, _count = self._bhead.unpack(raw)
+            if code == CODE_END:
+                break
+            block = (code, sdna_index, self._stream.tell(), length)
+            self.blocks.append(block)
+            if code == CODE_DNA:
+                sdna_block = block
+            self._stream.seek(length, io.SEEK_CUR)
+
+        if sdna_block is None:
+            raise BlendFileError(f"{self.path} has no DNA block.")
+        self.sdna = _SDNA(self.read_block(sdna_block), self.endian, self.pointer_size)
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def read_block(self, block, size=None) -> bytes:
+        _code, _sdna_index, offset, length = block
+        self._stream.seek(offset)
+        return self._stream.read(length if size is None else min(size, length))
+
+    def read_uints(self, data, offset, count):
+        return struct.unpack_from(f"{self.endian}{count}I", data, offset)
+
+    def id_name(self, block) -> str:
+        """
+        Name of the ID stored in an ID block, without its two letters type prefix.
+        """
+        offset, size = self.sdna.field("ID", "name")
+        raw = self.read_block(block, offset + size)[offset : offset + size]
+        return raw.split(b"\x00", 1)[0][2:].decode("utf-8", errors="replace")
+
+    def collection_blocks(self):
+        """
+        Yield (index in self.blocks, name) for each local collection.
+        """
+        for i, block in enumerate(self.blocks):
+            if block[0] == CODE_COLLECTION:
+                yield i, self.id_name(block)
+
+    def read_preview(self, id_block_index) -> BlendPreview:
+        """
+        Return the biggest preview stored after an ID block or None.
+        """
+        preview_sdna = self.sdna.struct_index.get("PreviewImage")
+        if preview_sdna is None:
+            return None
+
+        i = id_block_index + 1
+        while i < len(self.blocks) and self.blocks[i][0] == CODE_DATA:
+            if self.blocks[i][1] == preview_sdna:
+                break
+            i += 1
+        else:
+            return None
+
+        data = self.read_block(self.blocks[i])
+        width_offset, _size = self.sdna.field("PreviewImage", "w")
+        height_offset, _size = self.sdna.field("PreviewImage", "h")
+        rect_offset, _size = self.sdna.field("PreviewImage", "rect")
+        widths = self.read_uints(data, width_offset, 2)
+        heights = self.read_uints(data, height_offset, 2)
+        pointer_format = self.endian + ("2Q" if self.pointer_size == 8 else "2I")
+        rects = struct.unpack_from(pointer_format, data, rect_offset)
+
+        # Pixel blocks are written in size order, only for the non empty sizes.
+        best = None
+        pixels_index = i + 1
+        for size in range(2):
+            if not (rects[size] and widths[size] and heights[size]):
+                continue
+            if pixels_index >= len(self.blocks):
+                break
+            pixels_block = self.blocks[pixels_index]
+            pixels_index += 1
+            if pixels_block[3] != widths[size] * heights[size] * 4:
+                break
+            if best is None or widths[size] * heights[size] > best[0] * best[1]:
+                best = (widths[size], heights[size], pixels_block)
+
+        if best is None:
+            return None
+        return BlendPreview(best[0], best[1], self.read_block(best[2]))
+
+
+def read_collection_names(path) -> List[str]:
+    """
+    List the local collections of a .blend file, ie what bpy.data.libraries.load would show in data_from.collections.
+    """
+    with BlendFile(path) as blend, _corrupt_file_errors(path):
+        return [name for _index, name in blend.collection_blocks()]
+
+
+def read_collection_previews(path, names: Iterable[str] = None) -> Dict[str, BlendPreview]:
+    """
+    Return the embedded previews of the collections of a .blend, optionally restricted to some collection names.
+    Collections without preview are not part of the result.
+    """
+    wanted = None if names is None else set(names)
+    res = dict()
+    with BlendFile(path) as blend, _corrupt_file_errors(path):
+        for index, name in blend.collection_blocks():
+            if wanted is not None and name not in wanted:
+                continue
+            preview = blend.read_preview(index)
+            if preview is not None:
+                res[name] = preview
+    return res
+
+
+def write_png(path, preview: BlendPreview):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(preview.to_png())
@@ -0,0 +1,198 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Layout of the viewport overlay: a scrolling grid of square tiles with a scrollbar on the right.
+
+Coordinates follow Blender regions: origin at the bottom left of the panel, y going up. Items are laid out row by row
+from the top left. "Content" coordinates are the panel coordinates when the grid is not scrolled, scrolling moves the
+content up by scroll pixels. Only the items of visible_range need to exist, whatever the item count.
+
+This module does not use bpy, see tests/test_grid_layout.py and extra/benchmarks/grid_layout_benchmark.py.
+"""
+
+import bisect
+import math
+from typing import List, Optional, Tuple
+
+
+class GridLayout:
+    def __init__(self, item_count=0, width=800, height=306, tile_size=150, padding=2, scrollbar_width=12):
+        self.item_count = item_count
+        self.width = width
+        self.height = height
+        self.tile_size = tile_size
+        self.padding = padding
+        self.scrollbar_width = scrollbar_width
+        self.min_thumb_size = 16
+        self.scroll = 0.0  # Pixels scrolled from the top.
+        self.target_scroll = 0.0  # Where smooth scrolling goes to.
+        self.scroll_speed = 15.0  # Per second, fraction of the remaining distance.
+
+    # Geometry
+
+    @property
+    def pitch(self):
+        return self.tile_size + self.padding
+
+    @property
+    def columns(self):
+        return max(1, int((self.width - self.scrollbar_width - self.padding) // self.pitch))
+
+    @property
+    def rows(self):
+        return math.ceil(self.item_count / self.columns)
+
+    @property
+    def content_height(self):
+        return self.rows * self.pitch + self.padding
+
+    @property
+    def max_scroll(self):
+        return max(0.0, float(self.content_height - self.height))
+
+    def resize(self, width=None, height=None, tile_size=None):
+        """
+        Change the panel or tile size, keeping the first visible item in view.
+        """
+        first = self.visible_range()[0]
+        if width is not None:
+            self.width = width
+        if height is not None:
+            self.height = max(self.pitch + self.padding, height)
+        if tile_size is not None:
+            self.tile_size = tile_size
+        self.scroll_to_index(first, smooth=False)
+
+    def set_item_count(self, item_count):
+        self.item_count = item_count
+        self.scroll = self._clamp(self.scroll)
+        self.target_scroll = self._clamp(self.target_scroll)
+
+    def tile_origin(self, index) -> Tuple[float, float]:
+        """
+        Bottom left corner of a tile in content coordinates.
+        """
+        row, column = divmod(index, self.columns)
+        x = self.padding + column * self.pitch
+        y = self.height - (row + 1) * self.pitch
+        return x, y
+
+    def tile_rect(self, index) -> Tuple[float, float, float, float]:
+        """
+        x, y, width, height of a tile in panel coordinates.
+        """
+        x, y = self.tile_origin(index)
+        return x, y + self.scroll, self.tile_size, self.tile_size
+
+    def visible_range(self, margin_rows=0) -> Tuple[int, int]:
+        """
+        First and past the last indices of the items visible in the panel, plus margin_rows above and below.
+        """
+        first_row = int(self.scroll // self.pitch) - margin_rows
+        last_row = int((self.scroll + self.height) // self.pitch) + margin_rows
+        first = max(0, first_row) * self.columns
+        end = min(self.item_count, (last_row + 1) * self.columns)
+        return min(first, end), end
+
+    def hit_test(self, x, y) -> Optional[int]:
+        """
+        Index of the item under a point in panel coordinates, None if there is none.
+        """
+        if not (0 <= x < self.width - self.scrollbar_width and 0 <= y < self.height):
+            return None
+        column, in_x = divmod(x - self.padding, self.pitch)
+        row, in_y = divmod(self.height - y + self.scroll - self.padding, self.pitch)
+        if column < 0 or column >= self.columns or row < 0 or in_x >= self.tile_size or in_y >= self.tile_size:
+            return None
+        index = int(row) * self.columns + int(column)
+        return index if index < self.item_count else None
+
+    # Scrolling
+
+    def _clamp(self, scroll):
+        return min(max(0.0, float(scroll)), self.max_scroll)
+
+    def scroll_to(self, scroll, smooth=True):
+        self.target_scroll = self._clamp(scroll)
+        if not smooth:
+            self.scroll = self.target_scroll
+
+    def scroll_by(self, delta, smooth=True):
+        self.scroll_to(self.target_scroll + delta, smooth)
+
+    def scroll_rows(self, rows, smooth=True):
+        self.scroll_by(rows * self.pitch, smooth)
+
+    def scroll_to_index(self, index, smooth=True):
+        """
+        Scroll so that the row of index is at the top of the panel.
+        """
+        self.scroll_to((index // self.columns) * self.pitch, smooth)
+
+    @property
+    def is_animating(self):
+        return self.scroll != self.target_scroll
+
+    def animate(self, elapsed) -> bool:
+        """
+        Move the scroll towards its target for elapsed seconds. Return True while it has not reached it.
+        """
+        if not self.is_animating:
+            return False
+        remaining = self.target_scroll - self.scroll
+        step = remaining * min(1.0, elapsed * self.scroll_speed)
+        if abs(remaining - step) < 0.5:
+            self.scroll = self.target_scroll
+        else:
+            self.scroll += step
+        return self.is_animating
+
+    # Scrollbar
+
+    def scrollbar_rect(self) -> Tuple[float, float, float, float]:
+        return self.width - self.scrollbar_width, 0.0, self.scrollbar_width, self.height
+
+    def scrollbar_thumb_rect(self) -> Tuple[float, float, float, float]:
+        x, _y, width, _height = self.scrollbar_rect()
+        thumb_height = min(self.height, max(self.min_thumb_size, self.height * self.height / self.content_height))
+        travel = self.height - thumb_height
+        fraction = self.scroll / self.max_scroll if self.max_scroll else 0.0
+        return x, travel * (1.0 - fraction), width, thumb_height
+
+    def is_on_scrollbar(self, x, y) -> bool:
+        bar_x, bar_y, bar_width, bar_height = self.scrollbar_rect()
+        return bar_x <= x < bar_x + bar_width and bar_y <= y < bar_y + bar_height
+
+    def scroll_to_scrollbar(self, y, smooth=False):
+        """
+        Jump to the position of a point of the scrollbar, the thumb being centered on it.
+        """
+        thumb_height = self.scrollbar_thumb_rect()[3]
+        travel = self.height - thumb_height
+        if travel <= 0:
+            return
+        fraction = 1.0 - (y - thumb_height * 0.5) / travel
+        self.scroll_to(min(max(fraction, 0.0), 1.0) * self.max_scroll, smooth)
+
+
+def index_of_prefix(sorted_names: List[str], prefix) -> int:
+    """
+    Index of the first name starting with prefix, or following it, in names sorted in lower case. Used to jump to a
+    letter.
+    """
+    return bisect.bisect_left(sorted_names, prefix.lower())
@@ -0,0 +1,171 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Encoding of the json library files.
+
+The compression of a library is given by its file name: ".json" is plain json, ".json.gz" is gzip compressed and
+".json.zst" is zstd compressed (this one needs the zstandard module). Plain json is indented unless compact is set.
+
+The paths of the entries (PATH_FIELDS) are not stored in full: the folders are interned in a table kept under the
+reserved HEADER_KEY, and an entry path is "@<folder index>/<file name>". Folders inside the library folder are stored
+relative to it ("./..."), so a library can be moved with its assets, eg between Linux and Windows mount points.
+Paths are resolved once when the library is decoded and encoded when it is written, the rest of the addon only sees
+absolute paths. Libraries without the header (written by older versions) are read as they are.
+
+This module does not use bpy.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+SUFFIXES = (".json", ".json.gz", ".json.zst")
+HEADER_KEY = "__assetbank__"
+FORMAT_VERSION = 2
+PATH_FIELDS = ("blend_path", "thumbnail_path")
+
+compact = False
+
+
+class LibraryFormatError(ValueError):
+    pass
+
+
+def is_library_path(path) -> bool:
+    return str(path).lower().endswith(SUFFIXES)
+
+
+def _compression(path):
+    name = Path(path).name.lower()
+    if name.endswith(".gz"):
+        return "gz"
+    if name.endswith(".zst"):
+        return "zst"
+    return None
+
+
+def _zstandard(path):
+    try:
+        import zstandard
+    except ImportError:
+        raise LibraryFormatError(f"{path} is zstd compressed and the zstandard module is not available.")
+    return zstandard
+
+
+def _library_root(path):
+    return os.path.dirname(os.path.abspath(path)).replace("\\", "/")
+
+
+def _folder_key(folder):
+    # normcase turns "/" into "\\" on Windows, the keys use "/" everywhere.
+    return os.path.normcase(folder).replace("\\", "/")
+
+
+def _resolve_folder(root, folder):
+    if folder == ".":
+        folder = root
+    elif folder.startswith("./"):
+        folder = f"{root}/{folder[2:]}"
+    folder = os.path.normpath(folder)
+    # Roots such as "/", "C:\\" or "\\\\server\\share\\" already end with a separator.
+    return folder if folder.endswith(os.sep) else folder + os.sep
+
+
+def _resolve_paths(path, data: dict):
+    header = data.pop(HEADER_KEY, None)
+    if header is None:
+        return data
+    if header.get("format", 0) > FORMAT_VERSION:
+        raise LibraryFormatError(f"{path} was written by a newer version of the addon.")
+    root = _library_root(path)
+    folders = [_resolve_folder(root, folder) for folder in header.get("folders", list())]
+    for entry in data.values():
+        for field in PATH_FIELDS:
+            value = entry.get(field)
+            if value and value[0] == "@":
+                index, _, name = value[1:].partition("/")
+                entry[field] = folders[int(index)] + name
+    return data
+
+
+def _intern_paths(path, data: dict) -> dict:
+    root = _library_root(path)
+    root_key = _folder_key(root)
+    folders = list()
+    folder_indices = dict()
+    packed = dict()
+    for key, entry in data.items():
+        if any(entry.get(field) for field in PATH_FIELDS):
+            entry = dict(entry)
+            for field in PATH_FIELDS:
+                value = entry.get(field)
+                if not value:
+                    continue
+                folder, _, name = value.replace("\\", "/").rpartition("/")
+                if not folder:
+                    continue
+                folder_key = _folder_key(folder)
+                if folder_key == root_key:
+                    folder = "."
+                elif folder_key.startswith(root_key + "/"):
+                    folder = "./" + folder[len(root) + 1 :]
+                index = folder_indices.get(folder)
+                if index is None:
+                    index = folder_indices[folder] = len(folders)
+                    folders.append(folder)
+                entry[field] = f"@{index}/{name}"
+        packed[key] = entry
+    packed[HEADER_KEY] = {"format": FORMAT_VERSION, "folders": folders}
+    return packed
+
+
+def decode(path, raw: bytes) -> dict:
+    """
+    Return the content of the library file path from its raw bytes.
+    """
+    compression = _compression(path)
+    if compression == "gz":
+        raw = gzip.decompress(raw)
+    elif compression == "zst":
+        raw = _zstandard(path).ZstdDecompressor().decompressobj().decompress(raw)
+    return _resolve_paths(path, json.loads(raw)) if raw.strip() else dict()
+
+
+def encode(path, data: dict) -> bytes:
+    """
+    Return the raw bytes of the library file path holding data.
+    Compressed libraries are always compact, nobody reads them by hand.
+    """
+    compression = _compression(path)
+    data = _intern_paths(path, data)
+    if compact or compression is not None:
+        text = json.dumps(data, separators=(",", ":"))
+    else:
+        text = json.dumps(data, indent=2)
+    raw = text.encode("utf-8")
+    if compression == "gz":
+        return gzip.compress(raw, compresslevel=6)
+    if compression == "zst":
+        return _zstandard(path).ZstdCompressor(level=3).compress(raw)
+    return raw
+
+
+def read(path) -> dict:
+    with open(path, "rb") as f:
+        return decode(path, f.read())
@@ -0,0 +1,304 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Write-behind storage of the json libraries.
+
+Mutations are applied to an in-memory copy of the library right away, so reading it back shows them, and are written
+to disk in a single flush once the library has been quiet for quiet_period seconds (or on flush(), which the addon
+calls when saving the blend file and at exit). A flush asks for a backup point (see backups), applies the pending
+mutations on the current content of the file and replaces it atomically with a temporary file and a rename.
+
+Libraries are shared by several artists, so writes are optimistic instead of locked:
+ - each entry has a "version" stamp, incremented each time it is written.
+ - a flush reads the file, merges the pending mutations entry by entry and writes a temporary file. If the file changed
+   meanwhile (mtime, size or inode) the merge is done again on the new content, otherwise the temporary file replaces
+   the library.
+ - the file is read back after settle_delay to check that the mutations are there, in case another writer replaced it
+   at the same time. If they are not, the flush is retried.
+ - an entry whose version changed since it was read by this process is a conflict: a write wins over the other
+   writer change, a deletion does not. Conflicts are reported by flush.
+
+The library can be read and updated while a flush writes it: the file I/O is done without holding the lock, and the
+mutations made meanwhile are written by the next flush.
+
+The written libraries are acknowledged to the library watchers, so that this process does not reload its own writes.
+
+This module does not use bpy, flushes happen in a timer thread.
+"""
+
+import atexit
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+from . import backups
+from . import library_format
+from . import library_watcher
+
+quiet_period = 2.0  # seconds
+
+_lock = threading.RLock()  # Guards _pending and _flushing, never held during file I/O.
+_flush_lock = threading.RLock()  # Serializes the flushes, so that the writes of a library keep their order.
+_pending = dict()  # library path -> _PendingLibrary
+_flushing = dict()  # library path -> _PendingLibrary being written by a flush
+
+
+VERSION_KEY = "version"
+max_flush_attempts = 20
+settle_delay = 0.05  # seconds
+
+
+class _PendingLibrary:
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data  # Library content as seen by this process, pending mutations included.
+        self.mutations = dict()  # entry key -> (entry or None when deleted, version of the entry when it was read)
+        self.backup = False
+        self.timer = None
+        # Keys whose read version comes from the mutations of a flush in progress, set once it is done.
+        self.unsettled = set()
+
+
+def _version(entry):
+    return None if entry is None else entry.get(VERSION_KEY, 0)
+
+
+def _read(path) -> dict:
+    if not Path(path).is_file():
+        return dict()
+    return library_format.read(path)
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+def _write_if_unchanged(path, data, stamp) -> bool:
+    """
+    Replace the library with data unless its stamp is not the one it had when it was read. Return True if written.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(library_format.encode(path, data))
+            f.flush()
+            os.fsync(f.fileno())
+        written_stamp = _stamp(tmp_path)  # The rename keeps the mtime, size and inode.
+        if _stamp(path) != stamp:
+            return False
+        os.replace(tmp_path, path)
+        library_watcher.acknowledge(path, written_stamp)
+        return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load(path) -> Dict[str, dict]:
+    """
+    Return the content of a library, including the mutations not yet written.
+    """
+    with _lock:
+        pending = _pending.get(path) or _flushing.get(path)
+        if pending is not None:
+            return dict(pending.data)
+    return _read(path)
+
+
+def has_pending(path) -> bool:
+    with _lock:
+        return path in _pending or path in _flushing
+
+
+def update(path, entries: Dict[str, dict] = None, deleted: Iterable[str] = (), backup=True):
+    """
+    Add or replace entries and delete keys. The library file is written later, see flush.
+    """
+    with _lock:
+        pending = _pending.get(path)
+        flushing = _flushing.get(path)
+        if pending is None:
+            # The library content includes the mutations being written, if any.
+            pending = _PendingLibrary(path, dict(flushing.data) if flushing is not None else _read(path))
+            _pending[path] = pending
+        for key, entry in (entries or dict()).items():
+            read_version = _read_version(pending, flushing, key)
+            entry = dict(entry)
+            entry[VERSION_KEY] = (read_version or 0) + 1
+            pending.data[key] = entry
+            pending.mutations[key] = (entry, read_version)
+        for key in deleted:
+            read_version = _read_version(pending, flushing, key)
+            pending.data.pop(key, None)
+            pending.mutations[key] = (None, read_version)
+        pending.backup |= backup
+
+        _schedule(pending)
+
+
+def _read_version(pending, flushing, key):
+    if key in pending.mutations:
+        return pending.mutations[key][1]
+    if flushing is not None and key in flushing.mutations:
+        pending.unsettled.add(key)
+    return _version(pending.data.get(key))
+
+
+def _settle(pending, flushed, written):
+    """
+    Once a flush of the library is done, fix the read versions of the mutations made on top of its mutations.
+    If it was not written, its mutations are kept in pending.
+    """
+    for key in pending.unsettled:
+        entry, _read_version = pending.mutations[key]
+        if written:
+            read_version = _version(flushed.data.get(key))
+        else:
+            read_version = flushed.mutations[key][1]
+        if entry is not None:
+            entry[VERSION_KEY] = (read_version or 0) + 1
+        pending.mutations[key] = (entry, read_version)
+    pending.unsettled.clear()
+    if not written:
+        for key, mutation in flushed.mutations.items():
+            pending.mutations.setdefault(key, mutation)
+        pending.backup |= flushed.backup
+
+
+def _schedule(pending):
+    if pending.timer is not None:
+        pending.timer.cancel()
+    pending.timer = threading.Timer(quiet_period, flush, args=(pending.path,))
+    pending.timer.daemon = True
+    pending.timer.start()
+
+
+def _merge(pending, data):
+    """
+    Apply the pending mutations on the current library content. Return the keys in conflict.
+    """
+    conflicts = list()
+    for key, (entry, read_version) in pending.mutations.items():
+        current_version = _version(data.get(key))
+        if current_version != read_version:
+            conflicts.append(key)
+        if entry is None:
+            if current_version == read_version:
+                data.pop(key, None)
+        else:
+            entry[VERSION_KEY] = max(current_version or 0, read_version or 0) + 1
+            data[key] = entry
+    return conflicts
+
+
+def _is_written(pending, data):
+    for key, (entry, _read_version) in pending.mutations.items():
+        if entry is None:
+            if key in data and _version(data[key]) == pending.mutations[key][1]:
+                return False
+        elif _version(data.get(key)) != entry[VERSION_KEY]:
+            return False
+    return True
+
+
+def _flush_one(pending):
+    if pending.backup:
+        try:
+            backups.backup(pending.path)
+        except (OSError, ValueError) as e:
+            print(f"Could not backup library {pending.path}: {e}")
+    Path(pending.path).parent.mkdir(parents=True, exist_ok=True)
+    for attempt in range(max_flush_attempts):
+        if attempt:
+            # Random backoff so that writers racing for the same library do not keep colliding.
+            time.sleep(random.uniform(0.0, 0.005 * 2 ** min(attempt, 7)))
+        stamp = _stamp(pending.path)
+        data = _read(pending.path)
+        conflicts = _merge(pending, data)
+        if not _write_if_unchanged(pending.path, data, stamp):
+            continue
+        # Another writer which checked the file just before this rename replaces it right after: give it time to
+        # do so before checking that the mutations are there.
+        time.sleep(settle_delay)
+        if _is_written(pending, _read(pending.path)):
+            return conflicts
+    raise OSError(f"{pending.path} keeps being modified, could not write it.")
+
+
+def flush(path=None) -> Dict[str, list]:
+    """
+    Write now the pending mutations of a library, or of all the libraries if path is None.
+    Return the keys of the entries which were also modified by another writer, per library path.
+    """
+    all_conflicts = dict()
+    with _flush_lock:
+        with _lock:
+            paths = list(_pending) if path is None else [path]
+        for library_path in paths:
+            with _lock:
+                pending = _pending.pop(library_path, None)
+                if pending is None:
+                    continue
+                if pending.timer is not None:
+                    pending.timer.cancel()
+                _flushing[library_path] = pending
+
+            # The file I/O happens without the lock, reading and updating the library is not blocked meanwhile.
+            conflicts = None
+            try:
+                conflicts = _flush_one(pending)
+            except (OSError, ValueError) as e:
+                print(f"Could not write library {library_path}: {e}")
+
+            with _lock:
+                del _flushing[library_path]
+                newer = _pending.get(library_path)
+                if newer is not None:
+                    _settle(newer, pending, written=conflicts is not None)
+                elif conflicts is None:
+                    # Keep the mutations and try again later.
+                    _pending[library_path] = pending
+                if conflicts is None:
+                    _schedule(_pending[library_path])
+            if conflicts:
+                print(f"Entries also modified by someone else in {library_path}: {', '.join(conflicts)}")
+                all_conflicts[library_path] = conflicts
+    return all_conflicts
+
+
+def replace(path, data: Dict[str, dict]):
+    """
+    Write the whole content of a library now, eg to restore a backup. Pending mutations are written first.
+    """
+    with _flush_lock:
+        flush(path)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        for _attempt in range(max_flush_attempts):
+            if _write_if_unchanged(path, data, _stamp(path)):
+                return
+        raise OSError(f"{path} keeps being modified, could not write it.")
+
+
+atexit.register(flush)
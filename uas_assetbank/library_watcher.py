@@ -0,0 +1,205 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Detection of the library files changed by other processes, eg another artist banking into a shared library.
+
+A watcher is polled with the paths of the libraries and returns the ones which changed since the previous poll. The
+stamp of each library (mtime, size, inode) is compared at each poll, which costs one os.stat per library. On Linux an
+inotify instance also watches the folders of the libraries: libraries are replaced by a rename so the folder is
+watched rather than the file. Inotify reports local changes at once without stat calls, but does not see the changes
+made from other machines on network shares, these are still found by comparing the stamps every stat_interval seconds.
+
+The writes of this process are not changes: library_store acknowledges the stamp of each file it writes, so only the
+changes made by others are reported.
+
+This module does not use bpy, the addon polls the watcher from a timer, see refresh_scheduler.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+import weakref
+from typing import Dict, Iterable, Set
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+_watchers = weakref.WeakSet()  # The open watchers, to acknowledge the writes of this process.
+
+
+def acknowledge(path, stamp):
+    """
+    Tell the watchers that this process wrote a library, with the stamp of the written file, so that it is not
+    reported as changed. Called from the thread writing the library.
+    """
+    path = os.path.normpath(path)
+    for watcher in list(_watchers):
+        watcher.acknowledge(path, stamp)
+
+
+class StatWatcher:
+    def __init__(self):
+        self._stamps = dict()  # library path -> stamp at the last poll
+        _watchers.add(self)
+
+    def acknowledge(self, path, stamp):
+        # Only the stamps of watched paths are replaced, the dict does not change size while poll walks it.
+        if path in self._stamps:
+            self._stamps[path] = stamp
+
+    def set_paths(self, paths: Iterable[str]):
+        """
+        Set the watched libraries. Libraries newly watched are not reported as changed.
+        """
+        paths = set(paths)
+        for path in [path for path in self._stamps if path not in paths]:
+            del self._stamps[path]
+        for path in paths:
+            if path not in self._stamps:
+                self._stamps[path] = _stamp(path)
+
+    def _check(self, paths) -> Set[str]:
+        changed = set()
+        for path in paths:
+            stamp = _stamp(path)
+            if stamp != self._stamps.get(path):
+                self._stamps[path] = stamp
+                changed.add(path)
+        return changed
+
+    def poll(self) -> Set[str]:
+        """
+        Return the libraries which changed since the last poll.
+        """
+        return self._check(list(self._stamps))
+
+    def close(self):
+        self._stamps.clear()
+
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length, followed by the name
+
+
+class InotifyWatcher(StatWatcher):
+    def __init__(self, stat_interval=10.0):
+        StatWatcher.__init__(self)
+        self.stat_interval = stat_interval
+        self._last_stat = time.monotonic()
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._watches: Dict[str, int] = dict()  # folder -> watch descriptor
+        self._names: Dict[int, Dict[str, str]] = dict()  # watch descriptor -> file name -> library path
+
+    def set_paths(self, paths: Iterable[str]):
+        paths = set(paths)
+        StatWatcher.set_paths(self, paths)
+        folders = dict()
+        for path in paths:
+            folder, name = os.path.split(path)
+            folders.setdefault(folder, dict())[name] = path
+
+        for folder in [folder for folder in self._watches if folder not in folders]:
+            wd = self._watches.pop(folder)
+            self._names.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._names.clear()
+        for folder, names in folders.items():
+            wd = self._watches.get(folder)
+            if wd is None:
+                wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), _WATCH_MASK)
+                if wd < 0:
+                    continue  # Missing folder, the stamps still find the library if it shows up.
+                self._watches[folder] = wd
+            self._names[wd] = names
+
+    def _read_events(self) -> Set[str]:
+        touched = set()
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _cookie, length = _EVENT.unpack_from(buffer, offset)
+                name = buffer[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+                if mask & _IN_Q_OVERFLOW:
+                    touched.update(self._stamps)
+                elif mask & _IN_IGNORED:
+                    # The folder was removed, it is watched again by the next set_paths if it comes back.
+                    self._names.pop(wd, None)
+                    for folder in [folder for folder, folder_wd in self._watches.items() if folder_wd == wd]:
+                        del self._watches[folder]
+                else:
+                    path = self._names.get(wd, {}).get(os.fsdecode(name))
+                    if path is not None:
+                        touched.add(path)
+        return touched
+
+    def poll(self) -> Set[str]:
+        changed = self._check(self._read_events())
+        now = time.monotonic()
+        if now - self._last_stat >= self.stat_interval:
+            self._last_stat = now
+            changed |= StatWatcher.poll(self)
+        return changed
+
+    def close(self):
+        StatWatcher.close(self)
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches.clear()
+        self._names.clear()
+
+
+def create_watcher(stat_interval=10.0) -> StatWatcher:
+    """
+    An inotify watcher when available, a stat watcher otherwise.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(stat_interval)
+        except (OSError, AttributeError):
+            pass
+    return StatWatcher()
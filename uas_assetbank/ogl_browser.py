@@ -16,8 +16,8 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
-import math
 import time
+from collections import OrderedDict
 
 import bpy
 import blf
@@ -27,8 +27,11 @@ import gpu
 from gpu_extras.batch import batch_for_shader
 from mathutils import Vector
 
-from .utils import asset_match_filter
-from .thumbnails import get_thumbnail
+from . import preferences
+from . import asset_view
+from .grid_layout import GridLayout
+from .thumbnails import get_thumbnail, thumbnail_revision, previews_cols
+from .thumbnail_pixels import read_rgba8
 
 #
 # Drawing utils.
@@ -52,34 +55,57 @@ IMAGE_SHADER_2D = gpu.types.GPUShader(
 )
 
 
-def draw_square(position, width, height, color):
+QUAD_INDICES = ((0, 1, 2), (2, 1, 3))
+QUAD_UVS = ((0, 0), (1, 0), (0, 1), (1, 1))
+
+
+def quad_batch(shader, x, y, width, height):
     vertices = (
-        (position.x, position.y),
-        (position.x + width, position.y),
-        (position.x, position.y + height),
-        (position.x + width, position.y + height),
+        (x, y),
+        (x + width, y),
+        (x, y + height),
+        (x + width, y + height),
     )
-    indices = ((0, 1, 2), (2, 1, 3))
+    content = {"pos": vertices}
+    if shader is IMAGE_SHADER_2D:
+        content["texCoord"] = QUAD_UVS
+    return batch_for_shader(shader, "TRIS", content, indices=QUAD_INDICES)
+
+
+class CachedQuad:
+    """
+    The batch of a rectangle, built again only when the rectangle changes, ie on page or layout change.
+    """
 
-    batch = batch_for_shader(UNIFORM_SHADER_2D, "TRIS", {"pos": vertices}, indices=indices)
+    def __init__(self, shader):
+        self.shader = shader
+        self._key = None
+        self._batch = None
+
+    def batch(self, position, width, height):
+        key = (position.x, position.y, width, height)
+        if key != self._key:
+            self._batch = quad_batch(self.shader, position.x, position.y, width, height)
+            self._key = key
+        return self._batch
+
+
+def draw_square(position, width, height, color, quad: CachedQuad = None):
+    if quad is None:
+        batch = quad_batch(UNIFORM_SHADER_2D, position.x, position.y, width, height)
+    else:
+        batch = quad.batch(position, width, height)
 
     UNIFORM_SHADER_2D.bind()
     UNIFORM_SHADER_2D.uniform_float("color", color)
     batch.draw(UNIFORM_SHADER_2D)
 
 
-def draw_image(position, width, height, textureid):
-    vertices = (
-        (position.x, position.y),
-        (position.x + width, position.y),
-        (position.x, position.y + height),
-        (position.x + width, position.y + height),
-    )
-    indices = ((0, 1, 2), (2, 1, 3))
-
-    batch = batch_for_shader(
-        IMAGE_SHADER_2D, "TRIS", {"pos": vertices, "texCoord": ((0, 0), (1, 0), (0, 1), (1, 1))}, indices=indices,
-    )
+def draw_image(position, width, height, textureid, quad: CachedQuad = None):
+    if quad is None:
+        batch = quad_batch(IMAGE_SHADER_2D, position.x, position.y, width, height)
+    else:
+        batch = quad.batch(position, width, height)
 
     bgl.glActiveTexture(bgl.GL_TEXTURE0)
     bgl.glBindTexture(bgl.GL_TEXTURE_2D, textureid)
@@ -91,13 +117,15 @@ def draw_image(position, width, height, textureid):
 class GlTexture:
     def __init__(self, image_preview):
         width, height = image_preview.image_size
+        self.size = width * height * 4  # bytes on the gpu
         self._texture_id = bgl.Buffer(bgl.GL_INT, 1)
-        self.pixel_buffer = bgl.Buffer(bgl.GL_FLOAT, width * height * 4, list(image_preview.image_pixels_float))
+        pixels = read_rgba8(image_preview.image_pixels, width, height)
+        pixel_buffer = bgl.Buffer(bgl.GL_INT, len(pixels), pixels)  # Wraps the array memory, no copy.
 
         bgl.glGenTextures(1, self._texture_id)
         bgl.glBindTexture(bgl.GL_TEXTURE_2D, self._texture_id[0])
         bgl.glTexImage2D(
-            bgl.GL_TEXTURE_2D, 0, bgl.GL_RGB, width, height, 0, bgl.GL_RGBA, bgl.GL_FLOAT, self.pixel_buffer,
+            bgl.GL_TEXTURE_2D, 0, bgl.GL_RGBA8, width, height, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, pixel_buffer,
         )
 
         bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
@@ -111,6 +139,59 @@ class GlTexture:
         return self._texture_id[0]
 
 
+class TextureCache:
+    """
+    Thumbnail textures kept across pages and overlay toggles, so that only newly visible assets are uploaded.
+    The least recently used textures are released when the cache is over its budget.
+    """
+
+    def __init__(self):
+        self._textures = OrderedDict()  # (library, identifier, thumbnail revision) -> GlTexture
+        self._no_preview = None
+        self.size = 0
+
+    def get(self, asset) -> GlTexture:
+        key = (asset.library, asset.identifier, thumbnail_revision(asset.library, asset.identifier))
+        texture = self._textures.get(key)
+        if texture is not None:
+            self._textures.move_to_end(key)
+            return texture
+
+        preview = get_thumbnail(asset)
+        if preview == previews_cols["BUILDTIN"]["no_preview"]:
+            # Not cached per asset, its thumbnail may show up later.
+            if self._no_preview is None:
+                self._no_preview = GlTexture(preview)
+            return self._no_preview
+
+        texture = GlTexture(preview)
+        self._textures[key] = texture
+        self.size += texture.size
+        return texture
+
+    def trim(self, budget, in_use=()):
+        """
+        Release the least recently used textures until the cache fits in budget bytes. Textures in use are kept.
+        """
+        in_use = {id(texture) for texture in in_use}
+        for key in list(self._textures):
+            if self.size <= budget:
+                break
+            texture = self._textures[key]
+            if id(texture) in in_use:
+                continue
+            del self._textures[key]
+            self.size -= texture.size
+
+    def clear(self):
+        self._textures.clear()
+        self._no_preview = None
+        self.size = 0
+
+
+texture_cache = TextureCache()
+
+
 #
 #   Misc
 #
@@ -219,139 +300,264 @@ class BlWidget:
 
 
 class AssetThumbnail(BlWidget):
+    """
+    A tile of the overlay. Its position is in the grid content coordinates, the browser scrolls them.
+    """
+
     def __init__(self, index, asset, context, parent=None):
         BlWidget.__init__(self, context, parent)
         self.asset = asset
-        self.texture = GlTexture(get_thumbnail(self.asset))
+        self.texture = texture_cache.get(self.asset)
         self.show_tooltip = False
-        self._prev_click = 0
         self.index = index
-
-    def handle_event(self, event) -> bool:
-        props = self.context.window_manager.uas_asset_bank
-        self.show_tooltip = False
-        region, _area = get_region_at_xy(self.context, event.mouse_x, event.mouse_y)
-        mouse_x = event.mouse_x - region.x
-        mouse_y = event.mouse_y - region.y
-
-        if self.is_inside(mouse_x, mouse_y):
-            self.show_tooltip = True
-            if event.type == "LEFTMOUSE" and event.value == "PRESS":
-                counter = time.perf_counter()
-                props.selected_index = self.index
-                if counter - self._prev_click < 0.2:
-                    bpy.ops.uas.asset_bank_import(
-                        append=False, location=self.context.scene.cursor.location, index=self.index,
-                    )
-                self._prev_click = counter
-                return True
-
-        return False
+        self._image_quad = CachedQuad(IMAGE_SHADER_2D)
+        self._tooltip_quad = CachedQuad(UNIFORM_SHADER_2D)
 
     def draw(self):
-        draw_image(self.position, self.width, self.height, self.texture.texture_id)
+        draw_image(self.position, self.width, self.height, self.texture.texture_id, self._image_quad)
         if self.show_tooltip:
-            p = self.absolute_position
-            vertices = (
-                (p.x, p.y),
-                (p.x + self.width, p.y + 20),
-                (p.x, p.y + 20),
-                (p.x + self.width, p.y),
-            )
-            indices = ((0, 1, 2), (0, 1, 3))
-
-            batch = batch_for_shader(UNIFORM_SHADER_2D, "TRIS", {"pos": vertices}, indices=indices)
-
-            UNIFORM_SHADER_2D.bind()
-            UNIFORM_SHADER_2D.uniform_float("color", [0, 0, 0, 1])
-            batch.draw(UNIFORM_SHADER_2D)
+            draw_square(self.position, self.width, 20, [0, 0, 0, 1], self._tooltip_quad)
 
             blf.color(0, 0.99, 0.99, 0.99, 1)
             blf.size(0, 11, 72)
             text_width, text_height = blf.dimensions(0, self.asset.data_name)
-            posx = (self.width - text_width) * 0.5 + self.absolute_position.x
-            blf.position(0, posx, 8, 0)
+            posx = (self.width - text_width) * 0.5 + self.position.x
+            blf.position(0, posx, self.position.y + 6, 0)
             blf.draw(0, self.asset.data_name)
 
 
 class AssetBrowser(BlWidget):
+    """
+    Scrolling grid of the filtered assets at the bottom of the viewport. Only the tiles in view, plus a margin, exist.
+    Wheel scrolls, ctrl+wheel changes the tile size, the top edge can be dragged to resize the panel, the scrollbar
+    can be dragged and a letter key jumps to the first asset starting with it.
+    """
+
+    RESIZE_MARGIN = 4
+    PREFETCH_ROWS = 1
+
     def __init__(self, context, parent=None):
         BlWidget.__init__(self, context, parent)
-        self.item_per_page = 10
-        self.current_page = 0
-        self.max_page = self.current_page
-        self.asset_thumbnails = list()
+        props = self.context.window_manager.uas_asset_bank
+        self.view = asset_view.view
+        self._view_revision = None  # Revision of the shared view the tiles were made for.
+        self._filter = None  # Filter of the view the layout was scrolled for.
+        self.layout = GridLayout(height=props.overlay_height, tile_size=props.overlay_tile_size)
+        self.asset_thumbnails = dict()  # position in the view -> AssetThumbnail
+        self.hovered = None  # position in the view
+        self.dragging = None  # "SCROLLBAR" or "RESIZE"
+        self.needs_redraw = True  # Set when what is displayed changed, the operator then redraws the viewport.
+        self._prev_click = (None, 0.0)
+        self._last_draw = time.perf_counter()
+        self._panel_quad = CachedQuad(UNIFORM_SHADER_2D)
+        self._scrollbar_quad = CachedQuad(UNIFORM_SHADER_2D)
+        self._thumb_quad = CachedQuad(UNIFORM_SHADER_2D)
+
+        self.load_view()
 
-        self.paddingx = 2
-        self.height = 150
-        self.width = self.item_per_page * (self.height + self.paddingx) + self.paddingx
-        self.filter_name = self.context.window_manager.uas_asset_bank.filter_name
+    @property
+    def width(self):
+        return self.layout.width
 
-        self.load_page()
+    @width.setter
+    def width(self, value):
+        pass  # Given by the layout.
 
-    def load_page(self):
-        self.asset_thumbnails = list()
+    @property
+    def height(self):
+        return self.layout.height
+
+    @height.setter
+    def height(self, value):
+        pass  # Given by the layout.
+
+    def load_view(self):
         props = self.context.window_manager.uas_asset_bank
-        assets = [(i, a) for i, a in enumerate(props.assets)]
-        assets.sort(key=lambda a: a[1].data_name.lower())
-        if props.filter_name != "":
-            assets = [a for a in assets if asset_match_filter(a[1], props.filter_name.strip().lower().split(), 1)]
-
-        self.max_page = math.floor(len(assets) / self.item_per_page)
-        self.current_page = max(0, self.current_page)
-        self.current_page = min(self.max_page, self.current_page)
-        start = min(self.current_page * self.item_per_page, len(assets))
-        end = min(start + self.item_per_page, len(assets))
-
-        assets_to_show = assets[start:end]
-        posx = self.paddingx
-        for index, asset in assets_to_show:
-            at = AssetThumbnail(index, asset, self.context, self)
-            at.width = self.height
-            at.height = self.height - 4
-            at.position.x = posx
-            at.position.y = 2
-            posx += self.height + 2
-            self.asset_thumbnails.append(at)
-
-        self.width = len(assets_to_show) * (self.height + self.paddingx) + self.paddingx
+        asset_view.current_view(props)
+        if self.view.built_revision != self._view_revision:
+            self._view_revision = self.view.built_revision
+            view_filter = (self.view.filter_name, self.view.invert, self.view.reverse)
+            if view_filter != self._filter:
+                self._filter = view_filter
+                self.layout.scroll_to(0, smooth=False)
+            self.layout.set_item_count(len(self.view))
+            self.asset_thumbnails.clear()
+            self.hovered = None
+            self.needs_redraw = True
+        self.materialize()
+
+    def materialize(self):
+        """
+        Create the tiles entering the visible window and drop the ones leaving it.
+        """
+        first, end = self.layout.visible_range(margin_rows=self.PREFETCH_ROWS)
+        for position in [position for position in self.asset_thumbnails if not first <= position < end]:
+            del self.asset_thumbnails[position]
+        for position in range(first, end):
+            if position in self.asset_thumbnails:
+                continue
+            at = AssetThumbnail(position, self.view.assets[position], self.context, self)
+            at.position = Vector(self.layout.tile_origin(position))
+            at.width = at.height = self.layout.tile_size
+            self.asset_thumbnails[position] = at
+
+        budget = preferences.get_preferences().overlay_texture_budget * 1024 * 1024
+        texture_cache.trim(budget, in_use=[at.texture for at in self.asset_thumbnails.values()])
+
+    def relayout(self, width=None, height=None, tile_size=None):
+        self.layout.resize(width, height, tile_size)
+        self.asset_thumbnails.clear()
+        self.materialize()
+        self.needs_redraw = True
+
+    def set_hovered(self, position):
+        if position == self.hovered:
+            return
+        if self.hovered in self.asset_thumbnails:
+            self.asset_thumbnails[self.hovered].show_tooltip = False
+        self.hovered = position
+        self.needs_redraw = True
+        if position in self.asset_thumbnails:
+            self.asset_thumbnails[position].show_tooltip = True
+
+    def click(self, position):
+        props = self.context.window_manager.uas_asset_bank
+        asset = self.view.assets[position]
+        asset_view.select_position(props, position)
+        counter = time.perf_counter()
+        prev_position, prev_counter = self._prev_click
+        if prev_position == position and counter - prev_counter < 0.2:
+            bpy.ops.uas.asset_bank_import(
+                append=False, location=self.context.scene.cursor.location, identifier=asset.identifier
+            )
+        self._prev_click = (position, counter)
 
-    def handle_event(self, event) -> bool:
+    def handle_event(self, event, region) -> bool:
+        """
+        Handle an event happening over region, the viewport region under the mouse.
+        Return True if the event is used by the browser. Hovering and clicking tiles is resolved from the grid layout.
+        """
         props = self.context.window_manager.uas_asset_bank
-        if self.filter_name != props.filter_name:
-            self.filter_name = props.filter_name
-            self.current_page = 0
-            self.load_page()
-
-        region, _area = get_region_at_xy(self.context, event.mouse_x, event.mouse_y)
-        mouse_x = event.mouse_x - region.x
-        mouse_y = event.mouse_y - region.y
-        if self.is_inside(mouse_x, mouse_y):
-            if event.type == "WHEELUPMOUSE":
-                self.current_page -= 1
-                self.load_page()
-                return True
-            elif event.type == "WHEELDOWNMOUSE":
-                self.current_page += 1
-                self.load_page()
-                return True
-
-        for at in self.asset_thumbnails:
-            if at.handle_event(event):
-                return True
+        if self.view.is_stale:
+            self.load_view()
+
+        if region.width != self.layout.width:
+            self.relayout(width=region.width)
+        mouse_x = event.mouse_x - region.x - self.position.x
+        mouse_y = event.mouse_y - region.y - self.position.y
+
+        if self.dragging is not None:
+            if event.type == "LEFTMOUSE" and event.value == "RELEASE":
+                if self.dragging == "RESIZE":
+                    props.overlay_height = int(self.layout.height)
+                self.dragging = None
+            elif event.type == "MOUSEMOVE":
+                if self.dragging == "SCROLLBAR":
+                    self.layout.scroll_to_scrollbar(mouse_y)
+                    self.materialize()
+                    self.needs_redraw = True
+                else:
+                    self.relayout(height=mouse_y)
+            return True
+
+        on_resize_edge = 0 <= mouse_x < self.width and abs(mouse_y - self.height) <= self.RESIZE_MARGIN
+        if not on_resize_edge and not (0 <= mouse_x < self.width and 0 <= mouse_y < self.height):
+            self.set_hovered(None)
+            return False
+
+        self.set_hovered(self.layout.hit_test(mouse_x, mouse_y))
+        if event.type in ("WHEELUPMOUSE", "WHEELDOWNMOUSE"):
+            direction = -1 if event.type == "WHEELUPMOUSE" else 1
+            if event.ctrl:
+                tile_size = min(max(self.layout.tile_size - direction * 16, 48), 512)
+                props.overlay_tile_size = tile_size
+                self.relayout(tile_size=tile_size)
+            else:
+                self.layout.scroll_rows(direction)
+            return True
+        if event.type in ("PAGE_UP", "PAGE_DOWN") and event.value == "PRESS":
+            direction = -1 if event.type == "PAGE_UP" else 1
+            self.layout.scroll_by(direction * (self.height - self.layout.pitch))
+            return True
+        if len(event.type) == 1 and event.type.isalpha() and event.value == "PRESS" and not (event.ctrl or event.alt):
+            self.layout.scroll_to_index(self.view.index_of_prefix(event.type))
+            return True
+        if event.type == "LEFTMOUSE" and event.value == "PRESS":
+            if on_resize_edge:
+                self.dragging = "RESIZE"
+            elif self.layout.is_on_scrollbar(mouse_x, mouse_y):
+                self.dragging = "SCROLLBAR"
+                self.layout.scroll_to_scrollbar(mouse_y)
+                self.materialize()
+                self.needs_redraw = True
+            elif self.hovered is not None:
+                self.click(self.hovered)
+                self.needs_redraw = True
+            return True
 
         return False
 
-    def draw(self):
-        self.height = 150
-        draw_square(self.position, self.width, self.height, [0.2, 0.2, 0.2, 0.75])
-        for at in self.asset_thumbnails:
-            at.draw()
+    def animate(self) -> bool:
+        """
+        Advance smooth scrolling. Return True while it moves.
+        """
+        now = time.perf_counter()
+        elapsed = min(now - self._last_draw, 0.1)
+        self._last_draw = now
+        moving = self.layout.animate(elapsed)
+        if moving or self.layout.visible_range(self.PREFETCH_ROWS) != self._materialized_range():
+            self.materialize()
+        return moving
+
+    def _materialized_range(self):
+        if not self.asset_thumbnails:
+            return self.layout.visible_range(self.PREFETCH_ROWS)
+        return min(self.asset_thumbnails), max(self.asset_thumbnails) + 1
 
+    def draw(self):
+        if self.view.is_stale:
+            self.load_view()
+        self.animate()
+        draw_square(self.position, self.width, self.height, [0.2, 0.2, 0.2, 0.75], self._panel_quad)
+
+        scissor_enabled = bgl.glIsEnabled(bgl.GL_SCISSOR_TEST)
+        scissor_box = bgl.Buffer(bgl.GL_INT, 4)
+        bgl.glGetIntegerv(bgl.GL_SCISSOR_BOX, scissor_box)
+        bgl.glEnable(bgl.GL_SCISSOR_TEST)
+        bgl.glScissor(int(self.position.x), int(self.position.y), int(self.width), int(self.height))
+        with gpu.matrix.push_pop():
+            gpu.matrix.translate((self.position.x, self.position.y + self.layout.scroll))
+            for at in self.asset_thumbnails.values():
+                at.draw()
+        bgl.glScissor(*scissor_box)
+        if not scissor_enabled:
+            bgl.glDisable(bgl.GL_SCISSOR_TEST)
+
+        if self.layout.max_scroll > 0:
+            with gpu.matrix.push_pop():
+                gpu.matrix.translate((self.position.x, self.position.y))
+                x, y, width, height = self.layout.scrollbar_rect()
+                draw_square(Vector((x, y)), width, height, [0.1, 0.1, 0.1, 0.75], self._scrollbar_quad)
+                x, y, width, height = self.layout.scrollbar_thumb_rect()
+                draw_square(Vector((x, y)), width, height, [0.6, 0.6, 0.6, 0.9], self._thumb_quad)
+
+        first, end = self.layout.visible_range()
         blf.color(0, 0.99, 0.99, 0.99, 1)
         blf.size(0, 11, 72)
         blf.position(0, self.position.x + self.width * 0.5, self.position.y + self.height + 2, 0)
-        blf.draw(0, f"{self.current_page + 1}/{self.max_page + 1}")
+        blf.draw(0, f"{min(first + 1, end)}-{end} / {len(self.view)}")
+
+
+def redraw_overlay(context):
+    """
+    Redraw the viewports showing the overlay, eg when the assets or the filter changed.
+    """
+    if not context.window_manager.uas_asset_bank.toggle_overlay:
+        return
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == "VIEW_3D":
+                area.tag_redraw()
 
 
 class UAS_AssetBank_ViewportBrowser(bpy.types.Operator):
@@ -362,29 +568,53 @@ class UAS_AssetBank_ViewportBrowser(bpy.types.Operator):
         self.asset_browser = None
 
         self.draw_handle = None
-        self.draw_event = None
+        self.animation_event = None
+        self.hovered_area = None
 
-    def modal(self, context, event):
-        region, area = get_region_at_xy(context, event.mouse_x, event.mouse_y)
-
-        if region is None:
-            return {"PASS_THROUGH"}
-        area.tag_redraw()
-
-        if self.asset_browser.handle_event(event):
-            return {"RUNNING_MODAL"}
+    def update_animation_timer(self, context):
+        """
+        Redraw at a high rate only while scrolling smoothly, the overlay is otherwise redrawn on change only.
+        """
+        animating = self.asset_browser.layout.is_animating
+        if animating and self.animation_event is None:
+            self.animation_event = context.window_manager.event_timer_add(1 / 60, window=context.window)
+        elif not animating and self.animation_event is not None:
+            context.window_manager.event_timer_remove(self.animation_event)
+            self.animation_event = None
+
+    def finish(self, context):
+        if self.animation_event is not None:
+            context.window_manager.event_timer_remove(self.animation_event)
+            self.animation_event = None
+        bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle, "WINDOW")
 
+    def modal(self, context, event):
         if context.window_manager.uas_asset_bank.toggle_overlay is False:
-            context.window_manager.event_timer_remove(self.draw_event)
-            bpy.types.SpaceView3D.draw_handler_remove(self.draw_handle, "WINDOW")
+            self.finish(context)
+            if self.hovered_area is not None:
+                self.hovered_area.tag_redraw()
             return {"CANCELLED"}
 
-        return {"PASS_THROUGH"}
+        browser = self.asset_browser
+        region, area = get_region_at_xy(context, event.mouse_x, event.mouse_y)
+        if area != self.hovered_area:
+            # The tooltip of the previous area must go.
+            browser.set_hovered(None)
+            if self.hovered_area is not None:
+                self.hovered_area.tag_redraw()
+            self.hovered_area = area
+
+        handled = region is not None and browser.handle_event(event, region)
+        self.update_animation_timer(context)
+        if area is not None and (browser.needs_redraw or browser.layout.is_animating):
+            area.tag_redraw()
+            browser.needs_redraw = False
+
+        return {"RUNNING_MODAL"} if handled else {"PASS_THROUGH"}
 
     def invoke(self, context, event):
         self.asset_browser = AssetBrowser(context)
         self.draw_handle = bpy.types.SpaceView3D.draw_handler_add(self.draw, (context,), "WINDOW", "POST_PIXEL")
-        self.draw_event = context.window_manager.event_timer_add(0.1, window=context.window)
         context.window_manager.modal_handler_add(self)
         return {"RUNNING_MODAL"}
 
@@ -401,5 +631,6 @@ def register():
 
 
 def unregister():
+    texture_cache.clear()
     for cls in reversed(_classes):
         bpy.utils.unregister_class(cls)
@@ -16,18 +16,34 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from pathlib import Path
+from typing import List
+import os
 
 import bpy
+from bpy.app.handlers import persistent
 from bpy.props import (
     IntProperty,
     BoolProperty,
+    CollectionProperty,
+    EnumProperty,
     FloatVectorProperty,
+    StringProperty,
 )
+from mathutils import Euler, Matrix
 
 from . import preferences
 from . import plugin_manager
+from . import blend_cache
+from . import source_cache
+from . import banking_jobs
+from . import library_store
+from . import backups
+from . import asset_store
+from . import asset_view
+from . import ogl_browser
+from . import refresh_scheduler
 from .utils import get_thumbnail_path, delete_entry, list_entries, export_thumbnails
-from .thumbnails import get_thumbnail
+from .thumbnails import reload_thumbnail, extract_missing_previews
 
 """
 Operators for UAS Asset Bank
@@ -40,19 +56,20 @@ class UAS_AssetBank_Delete(bpy.types.Operator):
     bl_description = "Delete from database."
     bl_options = {"INTERNAL"}
 
-    index: IntProperty(default=-1)
+    identifier: StringProperty()
 
     def execute(self, context):
         props = context.window_manager.uas_asset_bank
-        prefs = preferences.get_preferences()
-        if 0 <= self.index < len(props.assets):
-            asset = props.assets[self.index]
-            for lib in prefs.libraries:
-                if asset.library == lib.name:
-                    delete_entry(lib.path, asset.identifier)
-                    bpy.ops.uas.asset_bank_refresh()
-                    props.selected_index = min(self.index, len(props.assets) - 1)
-                    break
+        library_path = asset_store.library_path(self.identifier)
+        if library_path:
+            selected_index = props.selected_index
+            delete_entry(library_path, self.identifier)
+            asset = asset_store.remove(self.identifier)
+            asset_view.current_view(props).remove(asset)
+            asset_view.update_window(props)
+            if props.selected_index < 0 <= selected_index:
+                props.selected_index = min(selected_index, len(props.assets) - 1)
+            ogl_browser.redraw_overlay(context)
 
         return {"FINISHED"}
 
@@ -63,96 +80,387 @@ class UAS_AssetBank_Delete(bpy.types.Operator):
         self.layout.label(text="Delete from database ?")
 
 
+_pending_collection_checks = list()
+
+
+def _flag_broken_assets():
+    """
+    Timer callback flagging the assets whose collection is not in their .blend, once the background reads are done.
+    """
+    if not all(future.done() for future in _pending_collection_checks):
+        return 0.2
+    _pending_collection_checks.clear()
+
+    window_manager = bpy.context.window_manager
+    names_per_file = dict()
+    for asset in asset_store.assets:
+        if asset.file not in names_per_file:
+            names_per_file[asset.file] = blend_cache.cached_collection_names(asset.file)
+        names = names_per_file[asset.file]
+        asset.broken = names is not None and asset.data_name not in names
+    asset_view.sync_window(window_manager.uas_asset_bank)
+
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            area.tag_redraw()
+    return None
+
+
+def check_collections(assets):
+    """
+    Read the collection names of the assets .blend in the background and flag the broken assets when done.
+    """
+    _pending_collection_checks.extend(blend_cache.prefetch(asset.file for asset in assets))
+    if not bpy.app.timers.is_registered(_flag_broken_assets):
+        bpy.app.timers.register(_flag_broken_assets, first_interval=0.2)
+
+
+def make_asset(identifier, library_name, values) -> asset_store.AssetRecord:
+    """
+    Build the record of a library entry.
+    """
+    file = values["blend_path"]
+    data_name = values["data_name"]
+    return asset_store.AssetRecord(
+        identifier,
+        library_name,
+        file,
+        data_name,
+        thumbnail_path=values.get("thumbnail_path") or get_thumbnail_path(file, data_name),
+        tags="; ".join(values.get("tags", list(""))),
+    )
+
+
+def add_assets(context, library_name, entries):
+    """
+    Add newly banked entries (key -> entry built with utils.make_entry) to the assets, replacing the assets with the
+    same identifiers, without reading the libraries again.
+    """
+    prefs = preferences.get_preferences()
+    library = next((lib for lib in prefs.libraries if lib.name == library_name), None)
+    if library is None or not library.enabled:
+        return
+
+    props = context.window_manager.uas_asset_bank
+    view = asset_view.current_view(props)
+    added = list()
+    for key, values in entries.items():
+        asset = make_asset(key, library.name, values)
+        previous = asset_store.put(asset, library.path)
+        if previous is not None:
+            view.remove(previous)
+        view.insert(asset)
+        added.append(asset)
+
+    asset_view.update_window(props)
+    ogl_browser.redraw_overlay(context)
+    check_collections(added)
+
+
+def sync_library(view, library_name, library_path) -> List[asset_store.AssetRecord]:
+    """
+    Update the assets of a loaded library from its file. Only the added, changed and removed entries are updated, in
+    the store and in the view. Return the added and changed assets.
+    """
+    current = {asset.identifier: asset for asset in asset_store.library_assets(library_name)}
+    changed = list()
+    for key, values in list_entries(library_path):
+        asset = make_asset(key, library_name, values)
+        previous = current.pop(key, None)
+        if previous is not None and previous.has_same_data(asset):
+            continue
+        previous = asset_store.put(asset, library_path)
+        if previous is not None:
+            view.remove(previous)
+        view.insert(asset)
+        changed.append(asset)
+
+    for key in current:
+        view.remove(asset_store.remove(key, library_name))
+    return changed
+
+
 class UAS_AssetBank_Refresh(bpy.types.Operator):
+    """
+    Reload the assets of some libraries, or of all of them. The assets of the libraries which are not enabled anymore
+    are dropped in any case. See refresh_scheduler to reload libraries in a deferred, coalesced way.
+    """
+
     bl_idname = "uas.asset_bank_refresh"
     bl_label = "Refresh"
     bl_description = "Refresh"
     bl_options = {"INTERNAL"}
 
+    libraries: CollectionProperty(type=bpy.types.PropertyGroup)  # Library names in the name field, all when empty.
+
     def execute(self, context):
         props = context.window_manager.uas_asset_bank
-        assets = props.assets
-        assets.clear()
-
         addon_prefs = preferences.get_preferences()
+        library_paths = dict()
         for lib in addon_prefs.libraries:
-            if not lib.enabled:
-                continue
-            for key, values in list_entries(lib.path):
-                new_asset = assets.add()
-                new_asset.identifier = key
-                new_asset.file = values["blend_path"].replace("/", "\\")
-                new_asset.data_name = values["data_name"]
-                new_asset.library = lib.name
-                blend_name = Path(new_asset.file).name
-                new_asset.nice_name = f"{new_asset.data_name}::{blend_name}"
-                new_asset.thumbnail_path = values.get(
-                    "thumbnail_path",
-                    get_thumbnail_path(new_asset.file, new_asset.data_name),
-                ).replace("/", "\\")
-                new_asset.tags = "; ".join(values.get("tags", list("")))
-
-        props.selected_index = min(props.selected_index, len(assets) - 1)
+            if lib.enabled:
+                library_paths.setdefault(lib.name, lib.path)
+
+        if len(self.libraries):
+            to_reload = {item.name for item in self.libraries}
+        else:
+            to_reload = set(library_paths)
+            refresh_scheduler.cancel()
+
+        if len(self.libraries) and asset_store.loaded_libraries() == library_paths:
+            # Only the content of loaded libraries changed, eg another artist banked: update the changed assets.
+            view = asset_view.current_view(props)
+            loaded = list()
+            for name in sorted(to_reload & set(library_paths)):
+                try:
+                    changed = sync_library(view, name, library_paths[name])
+                except (OSError, ValueError) as e:
+                    print(f"Could not reload the library {name}: {e}")
+                    continue
+                for asset in changed:
+                    reload_thumbnail(name, asset.identifier)
+                loaded.extend(changed)
+        else:
+            assets = [
+                asset
+                for asset in asset_store.assets
+                if asset.library in library_paths and asset.library not in to_reload
+            ]
+            loaded = list()
+            for name, path in library_paths.items():
+                if name in to_reload:
+                    loaded.extend(make_asset(key, name, values) for key, values in list_entries(path))
+            asset_store.set_assets(assets + loaded, library_paths)
+            asset_view.invalidate()
+
+        asset_view.update_window(props)
+        ogl_browser.redraw_overlay(context)
+        check_collections(loaded)
+        prefetch_sources()
         if context.area is not None:
             context.area.tag_redraw()
         return {"FINISHED"}
 
 
+def get_source_path(filepath, append):
+    """
+    Path to import an asset .blend from: the local cache copy when enabled, the library path otherwise.
+    """
+    prefs = preferences.get_preferences()
+    if not prefs.local_cache_enabled:
+        return filepath
+    if append or prefs.local_cache_link:
+        source_cache.set_in_use(_library_paths_in_use())
+        return source_cache.get_local_copy(filepath, prefs.local_cache_dir, prefs.local_cache_size * 1024 * 1024)
+    source_cache.record_usage(filepath, prefs.local_cache_dir)
+    return filepath
+
+
+def get_known_copy(filepath):
+    """
+    Path of the local cache copy of a .blend if there is one, without copying it nor reading the original file.
+    """
+    prefs = preferences.get_preferences()
+    if not prefs.local_cache_enabled or not prefs.local_cache_link:
+        return None
+    return source_cache.known_copy(filepath, prefs.local_cache_dir)
+
+
+def _library_paths_in_use():
+    return [bpy.path.abspath(library.filepath) for library in bpy.data.libraries]
+
+
+def prefetch_sources():
+    prefs = preferences.get_preferences()
+    if prefs.local_cache_enabled:
+        source_cache.set_in_use(_library_paths_in_use())
+        source_cache.prefetch(prefs.local_cache_dir, prefs.local_cache_size * 1024 * 1024)
+
+
+_FILEPATH_DATA = ("images", "libraries", "sounds", "movieclips", "fonts", "cache_files", "volumes")
+
+
+def remap_cached_paths(local_path, source_path):
+    """
+    Appending from the local copy of a .blend makes the relative paths of the appended data (textures, sounds, nested
+    libraries...) point into the cache folder. Point them back to the folder of the original .blend.
+    """
+    local_dir = os.path.dirname(os.path.abspath(local_path))
+    local_prefix = os.path.normcase(local_dir) + os.sep
+    source_dir = os.path.dirname(os.path.abspath(source_path))
+    for data_name in _FILEPATH_DATA:
+        for datablock in getattr(bpy.data, data_name, ()):
+            filepath = datablock.filepath
+            if not filepath or datablock.library is not None or getattr(datablock, "packed_file", None) is not None:
+                continue
+            absolute = os.path.normpath(bpy.path.abspath(filepath))
+            # The cache copies themselves, eg linked from, exist in the cache folder.
+            if not os.path.normcase(absolute).startswith(local_prefix) or os.path.exists(absolute):
+                continue
+            remapped = os.path.join(source_dir, os.path.relpath(absolute, local_dir))
+            if filepath.startswith("//") and bpy.data.filepath:
+                try:
+                    remapped = bpy.path.relpath(remapped)
+                except ValueError:
+                    pass  # Another drive.
+            datablock.filepath = remapped
+
+
+def find_linked_collection(filepath, collection_name):
+    """
+    Return the collection with this name already linked from filepath in the current file, or None.
+    """
+    filepath = os.path.normcase(os.path.normpath(filepath))
+    for library in bpy.data.libraries:
+        if os.path.normcase(os.path.normpath(bpy.path.abspath(library.filepath))) == filepath:
+            return bpy.data.collections.get((collection_name, library.filepath))
+    return None
+
+
+def load_collections(filepath, collection_names, link):
+    """
+    Append or link several collections of a .blend with a single library open.
+    When linking, collections already linked from this file are reused and the library is not opened for them.
+    The file is read from the local cache when it is enabled, the paths of the appended data are then remapped to the
+    original file folder.
+    Return a dict collection name -> loaded collection, missing collections are not part of it.
+    """
+    res = dict()
+    if link:
+        copy_path = get_known_copy(filepath)
+        for name in collection_names:
+            collection = find_linked_collection(filepath, name)
+            if collection is None and copy_path is not None:
+                collection = find_linked_collection(copy_path, name)
+            if collection is not None:
+                res[name] = collection
+
+    to_load = [name for name in collection_names if name not in res]
+    if not to_load:
+        return res
+
+    source_path = get_source_path(filepath, append=not link)
+    with bpy.data.libraries.load(source_path, link=link) as (data_from, data_to):
+        found = [name for name in to_load if name in data_from.collections]
+        data_to.collections = found
+
+    if not link and source_path != filepath:
+        remap_cached_paths(source_path, filepath)
+    res.update({name: col for name, col in zip(found, data_to.collections) if col is not None})
+    return res
+
+
+def add_to_scene(context, collection, append, location):
+    """
+    Link an appended collection to the scene, or create an instance of a linked one at location.
+    Return the datablock added to the scene. Raise RuntimeError if the collection is already in the scene.
+    """
+    if append:
+        context.scene.collection.children.link(collection)
+        return collection
+
+    instance = bpy.data.objects.new(collection.name, None)
+    instance.location = location
+    instance.instance_type = "COLLECTION"
+    instance.instance_collection = collection
+    context.scene.collection.objects.link(instance)
+    return instance
+
+
+def add_instances(context, collection, matrices):
+    """
+    Create one instance of a collection per world matrix, linked to the scene collection. Return the instances.
+    """
+    scene_objects = context.scene.collection.objects
+    instances = list()
+    for matrix in matrices:
+        instance = bpy.data.objects.new(collection.name, None)
+        instance.instance_type = "COLLECTION"
+        instance.instance_collection = collection
+        instance.matrix_world = matrix
+        scene_objects.link(instance)
+        instances.append(instance)
+    return instances
+
+
+def find_asset(context, identifier) -> asset_store.AssetRecord:
+    return asset_store.find(identifier)
+
+
+def instance_asset(context, identifier: str, matrices) -> List[bpy.types.Object]:
+    """
+    Link the collection of an asset once and create one instance per world matrix. Meant for scripts placing many
+    assets: the library is opened at most once, the selection is updated once and the plugin on_import_batch_post
+    callback is called once with all the instances.
+
+    :param identifier: The asset identifier, as in the library.
+    :param matrices: An iterable of mathutils.Matrix.
+    :return: The created instances.
+    """
+    asset = find_asset(context, identifier)
+    if asset is None:
+        raise ValueError(f"No asset {identifier} in the enabled libraries.")
+
+    collection = find_linked_collection(asset.file, asset.data_name)
+    if collection is None:
+        if blend_cache.has_collection(asset.file, asset.data_name) is False or not Path(asset.file).exists():
+            raise ValueError(f"{asset.data_name} could not be found in {asset.file}")
+        collection = load_collections(asset.file, [asset.data_name], link=True).get(asset.data_name)
+        if collection is None:
+            raise ValueError(f"{asset.data_name} could not be found in {asset.file}")
+
+    instances = add_instances(context, collection, matrices)
+    plugin_manager.on_import_batch_post(context.scene, instances)
+    select_imported(context, instances)
+    return instances
+
+
+def select_imported(context, imported):
+    """
+    Replace the selection with the objects of the imported collections and instances.
+    """
+    for o in context.selected_objects:
+        o.select_set(False)
+    for datablock in imported:
+        if isinstance(datablock, bpy.types.Collection):
+            for o in datablock.objects:
+                o.select_set(True)
+        else:
+            datablock.select_set(True)
+
+
 class UAS_AssetBank_Import(bpy.types.Operator):
     bl_idname = "uas.asset_bank_import"
     bl_label = "Import Asset"
     bl_description = "Import Asset"
     bl_options = {"INTERNAL"}
 
-    index: IntProperty(default=-1)
+    identifier: StringProperty()
     append: BoolProperty(default=False)
     location: FloatVectorProperty()
 
     def execute(self, context):
-        props = context.window_manager.uas_asset_bank
-        if 0 <= self.index < len(props.assets):
-            asset = props.assets[self.index]
-            if Path(asset.file).exists():
-                with bpy.data.libraries.load(asset.file, link=not self.append) as (
-                    data_from,
-                    data_to,
-                ):
-                    if asset.data_name in data_from.collections:
-                        data_to.collections.append(asset.data_name)
-                    else:
-                        self.report(
-                            {"WARNING"},
-                            f"{asset.data_name} could not be found in {asset.file}",
-                        )
-
-                new_col = data_to.collections[0]
-                if self.append:
-                    # if coll.name in context.scene.collection.children:
-                    # context.scene.collection.children.link ( unlink_hierarchy ( coll ) )
-                    # else:
-                    try:
-                        context.scene.collection.children.link(new_col)
-                        plugin_manager.on_import_post(context.scene, new_col)
-                        for o in context.selected_objects:
-                            o.select_set(False)
-                        for o in new_col.objects:
-                            o.select_set(True)
-                    except RuntimeError:
-                        self.report(
-                            {"WARNING"},
-                            f"{new_col.name} already in {context.scene.collection.name}",
-                        )
-                        return {"CANCELLED"}
-                else:
-                    instance = bpy.data.objects.new(new_col.name, None)
-                    instance.location = self.location
-                    instance.instance_type = "COLLECTION"
-                    instance.instance_collection = new_col
-                    context.scene.collection.objects.link(instance)
-                    plugin_manager.on_import_post(context.scene, instance)
-                    for o in context.selected_objects:
-                        o.select_set(False)
-                    instance.select_set(True)
+        asset = find_asset(context, self.identifier)
+        if asset is not None:
+            # Placing again an already linked asset does not need to touch the file at all.
+            new_col = None if self.append else find_linked_collection(asset.file, asset.data_name)
+            if new_col is None and blend_cache.has_collection(asset.file, asset.data_name) is False:
+                self.report({"WARNING"}, f"{asset.data_name} could not be found in {asset.file}")
+                return {"CANCELLED"}
+            if new_col is not None or Path(asset.file).exists():
+                if new_col is None:
+                    new_col = load_collections(asset.file, [asset.data_name], link=not self.append).get(asset.data_name)
+                if new_col is None:
+                    self.report({"WARNING"}, f"{asset.data_name} could not be found in {asset.file}")
+                    return {"CANCELLED"}
+
+                try:
+                    imported = add_to_scene(context, new_col, self.append, self.location)
+                except RuntimeError:
+                    self.report({"WARNING"}, f"{new_col.name} already in {context.scene.collection.name}")
+                    return {"CANCELLED"}
+                plugin_manager.on_import_post(context.scene, imported)
+                select_imported(context, [imported])
 
                 return {"FINISHED"}
             else:
@@ -164,24 +472,262 @@ class UAS_AssetBank_Import(bpy.types.Operator):
         return self.execute(context)
 
 
+class UAS_AssetBank_ImportBatch(bpy.types.Operator):
+    """
+    Import several assets, opening each .blend only once. When invoked, files are processed one per timer tick so the
+    ui stays responsive, Esc cancels the remaining files.
+    """
+
+    bl_idname = "uas.asset_bank_import_batch"
+    bl_label = "Import Assets"
+    bl_description = "Import the checked assets"
+    bl_options = {"INTERNAL"}
+
+    identifiers: CollectionProperty(type=bpy.types.PropertyGroup)  # Asset identifiers in the name field.
+    append: BoolProperty(default=False)
+    location: FloatVectorProperty()
+
+    def __init__(self):
+        self._groups = list()  # List of (blend path, list of collection names).
+        self._imported = list()
+        self._timer = None
+        self._timer_duration = 0.0  # Duration of the timer at its last tick.
+        self._done = 0
+
+    def _group_assets(self, context):
+        if len(self.identifiers):
+            wanted = {item.name for item in self.identifiers}
+            assets = [asset for asset in asset_store.assets if asset.identifier in wanted]
+        else:
+            assets = asset_store.checked_assets()
+
+        groups = dict()
+        for asset in assets:
+            if blend_cache.has_collection(asset.file, asset.data_name) is False:
+                self.report({"WARNING"}, f"{asset.data_name} could not be found in {asset.file}")
+                continue
+            names = groups.setdefault(asset.file, list())
+            if asset.data_name not in names:
+                names.append(asset.data_name)
+        self._groups = list(groups.items())
+
+    def _import_group(self, context, filepath, collection_names):
+        if not Path(filepath).exists():
+            self.report({"WARNING"}, f"{filepath} does not exists.")
+            return
+
+        loaded = load_collections(filepath, collection_names, link=not self.append)
+        for name in collection_names:
+            if name not in loaded:
+                self.report({"WARNING"}, f"{name} could not be found in {filepath}")
+                continue
+            try:
+                imported = add_to_scene(context, loaded[name], self.append, self.location)
+            except RuntimeError:
+                self.report({"WARNING"}, f"{name} already in {context.scene.collection.name}")
+                continue
+            plugin_manager.on_import_post(context.scene, imported)
+            self._imported.append(imported)
+
+    def _finish(self, context):
+        select_imported(context, self._imported)
+        for asset in asset_store.checked_assets():
+            asset.checked = False
+        asset_view.sync_window(context.window_manager.uas_asset_bank)
+        self.report({"INFO"}, f"{len(self._imported)} assets imported from {self._done} files.")
+
+    def execute(self, context):
+        self._group_assets(context)
+        for filepath, collection_names in self._groups:
+            self._import_group(context, filepath, collection_names)
+            self._done += 1
+        self._finish(context)
+        return {"FINISHED"}
+
+    def invoke(self, context, event):
+        self.location = context.scene.cursor.location
+        self._group_assets(context)
+        if len(self._groups) <= 1:
+            return self.execute(context)
+
+        context.window_manager.progress_begin(0, len(self._groups))
+        self._timer = context.window_manager.event_timer_add(0.01, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        return {"RUNNING_MODAL"}
+
+    def modal(self, context, event):
+        if event.type == "ESC":
+            self._end_modal(context)
+            self._finish(context)
+            self.report({"WARNING"}, f"Import cancelled, {len(self._groups) - self._done} files skipped.")
+            return {"CANCELLED"}
+
+        # Events do not tell which timer fired, the duration of the timer only grows when it is the operator's one.
+        # Other timers, eg the scroll animation of the overlay or other addons, must not import faster.
+        if event.type == "TIMER" and self._timer is not None and self._timer.time_duration > self._timer_duration:
+            self._timer_duration = self._timer.time_duration
+            filepath, collection_names = self._groups[self._done]
+            context.workspace.status_text_set(f"Asset Bank: importing from {Path(filepath).name}, Esc to cancel")
+            self._import_group(context, filepath, collection_names)
+            self._done += 1
+            context.window_manager.progress_update(self._done)
+            if self._done == len(self._groups):
+                self._end_modal(context)
+                self._finish(context)
+                return {"FINISHED"}
+            return {"RUNNING_MODAL"}
+
+        # Let the other events reach the ui, eg to navigate the viewport while importing.
+        return {"PASS_THROUGH"}
+
+    def _end_modal(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+
+class UAS_AssetBank_Transform(bpy.types.PropertyGroup):
+    location: FloatVectorProperty(subtype="TRANSLATION")
+    rotation: FloatVectorProperty(subtype="EULER")
+    scale: FloatVectorProperty(default=(1.0, 1.0, 1.0))
+
+    def to_matrix(self):
+        rotation = Euler(self.rotation).to_matrix().to_4x4()
+        return Matrix.Translation(self.location) @ rotation @ Matrix.Diagonal(self.scale).to_4x4()
+
+
+class UAS_AssetBank_InstanceMany(bpy.types.Operator):
+    """
+    Operator version of instance_asset, eg:
+    bpy.ops.uas.asset_bank_instance_many(identifier="Tree:props", transforms=[{"location": (0, 0, 0)}, ...])
+    """
+
+    bl_idname = "uas.asset_bank_instance_many"
+    bl_label = "Instance Asset Many Times"
+    bl_description = "Link an asset once and create one instance per transform"
+    bl_options = {"INTERNAL", "UNDO"}
+
+    identifier: StringProperty()
+    transforms: CollectionProperty(type=UAS_AssetBank_Transform)
+
+    def execute(self, context):
+        try:
+            instances = instance_asset(context, self.identifier, [t.to_matrix() for t in self.transforms])
+        except ValueError as e:
+            self.report({"WARNING"}, str(e))
+            return {"CANCELLED"}
+
+        self.report({"INFO"}, f"{len(instances)} instances created.")
+        return {"FINISHED"}
+
+
 class UAS_AssetBank_GenerateThumbnail(bpy.types.Operator):
     bl_idname = "uas.asset_bank_generate_thumbnail"
     bl_label = "Generate Thumbnail"
     bl_description = "Generate Thumbnail"
     bl_options = {"INTERNAL"}
 
-    index: IntProperty(default=-1)
+    identifier: StringProperty()
 
     def execute(self, context):
-        props = context.window_manager.uas_asset_bank
-        if 0 <= self.index < len(props.assets):
-            asset = props.assets[self.index]
+        asset = find_asset(context, self.identifier)
+        if asset is not None:
             export_thumbnails(
                 context,
                 asset.thumbnail_path,
                 preferences.get_preferences().thumbnails_resolution,
             )
-            get_thumbnail(asset).reload()
+            reload_thumbnail(asset.library, asset.identifier)
+        return {"FINISHED"}
+
+
+class UAS_AssetBank_ExtractPreviews(bpy.types.Operator):
+    bl_idname = "uas.asset_bank_extract_previews"
+    bl_label = "Extract Embedded Previews"
+    bl_description = "Use the previews saved in the .blend files for the assets without thumbnail"
+    bl_options = {"INTERNAL"}
+
+    def execute(self, context):
+        count = extract_missing_previews(asset_store.assets)
+        self.report({"INFO"}, f"{count} previews extracted.")
+        if context.area is not None:
+            context.area.tag_redraw()
+        return {"FINISHED"}
+
+
+class UAS_AssetBank_RetryJob(bpy.types.Operator):
+    bl_idname = "uas.asset_bank_retry_job"
+    bl_label = "Retry"
+    bl_description = "Retry the failed banking job"
+    bl_options = {"INTERNAL"}
+
+    job_id: IntProperty(default=-1)
+
+    def execute(self, context):
+        banking_jobs.retry(self.job_id)
+        return {"FINISHED"}
+
+
+class UAS_AssetBank_DismissJob(bpy.types.Operator):
+    bl_idname = "uas.asset_bank_dismiss_job"
+    bl_label = "Dismiss"
+    bl_description = "Forget the failed banking job"
+    bl_options = {"INTERNAL"}
+
+    job_id: IntProperty(default=-1)
+
+    def execute(self, context):
+        banking_jobs.dismiss(self.job_id)
+        return {"FINISHED"}
+
+
+_backup_point_items = list()  # Blender needs a reference on the dynamic enum items.
+
+
+def _list_backup_points(self, context):
+    global _backup_point_items
+    prefs = preferences.get_preferences()
+    library = next((lib for lib in prefs.libraries if lib.name == self.library), None)
+    points = backups.list_points(library.path) if library is not None and library.path else list()
+    _backup_point_items = [(point.id, point.label, "") for point in points]
+    return _backup_point_items
+
+
+class UAS_AssetBank_RestoreBackup(bpy.types.Operator):
+    bl_idname = "uas.asset_bank_restore_backup"
+    bl_label = "Restore Library Backup"
+    bl_description = "Restore a library as it was at a backup point. The current content is backed up first"
+    bl_options = {"INTERNAL"}
+
+    library: StringProperty()
+    point: EnumProperty(name="Backup", items=_list_backup_points)
+
+    def invoke(self, context, event):
+        if not self.library:
+            self.library = context.window_manager.uas_asset_bank.library
+        return context.window_manager.invoke_props_dialog(self)
+
+    def draw(self, context):
+        self.layout.label(text=f"Library: {self.library}")
+        self.layout.prop(self, "point")
+
+    def execute(self, context):
+        prefs = preferences.get_preferences()
+        library = next((lib for lib in prefs.libraries if lib.name == self.library), None)
+        if library is None or library.readonly or not self.point:
+            self.report({"WARNING"}, "No backup to restore.")
+            return {"CANCELLED"}
+
+        try:
+            data = backups.load_point(library.path, self.point)
+            library_store.flush(library.path)
+            backups.backup(library.path, force=True)
+            library_store.replace(library.path, data)
+        except (OSError, ValueError, KeyError) as e:
+            self.report({"WARNING"}, f"Could not restore {library.name}: {e}")
+            return {"CANCELLED"}
+
+        refresh_scheduler.schedule(library.name)
         return {"FINISHED"}
 
 
@@ -198,19 +744,39 @@ class UAS_AssetBank_ToggleOverlay(bpy.types.Operator):
 
 
 classes = (
+    UAS_AssetBank_Transform,
     UAS_AssetBank_Delete,
     UAS_AssetBank_Import,
+    UAS_AssetBank_ImportBatch,
+    UAS_AssetBank_InstanceMany,
     UAS_AssetBank_Refresh,
     UAS_AssetBank_GenerateThumbnail,
+    UAS_AssetBank_ExtractPreviews,
+    UAS_AssetBank_RetryJob,
+    UAS_AssetBank_DismissJob,
+    UAS_AssetBank_RestoreBackup,
     UAS_AssetBank_ToggleOverlay,
 )
 
 
+@persistent
+def _flush_libraries(*args):
+    library_store.flush()
+
+
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    bpy.app.handlers.save_pre.append(_flush_libraries)
 
 
 def unregister():
+    if _flush_libraries in bpy.app.handlers.save_pre:
+        bpy.app.handlers.save_pre.remove(_flush_libraries)
+    library_store.flush()
+    if bpy.app.timers.is_registered(_flag_broken_assets):
+        bpy.app.timers.unregister(_flag_broken_assets)
+    blend_cache.clear()
+    banking_jobs.stop()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
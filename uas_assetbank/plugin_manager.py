@@ -30,10 +30,19 @@ def _nop(*args, **kwargs):
     pass
 
 
+def _import_batch_post_fallback(scene, imported):
+    """
+    Used when the plugin does not define on_import_batch_post, forward each imported datablock to on_import_post.
+    """
+    for datablock in imported:
+        on_import_post(scene, datablock)
+
+
 #
 # Callbacks.
 #
 on_import_post = _nop
+on_import_batch_post = _import_batch_post_fallback
 
 # The plugin module when one is specified in the ui.
 plugin_module = None
@@ -55,13 +64,16 @@ def register_plugin(plugin_path):
     spec.loader.exec_module(plugin_module)
     plugin_module.register()
 
-    global on_import_post
+    global on_import_post, on_import_batch_post
     if hasattr(plugin_module, "on_import_post"):
         on_import_post = plugin_module.on_import_post
+    if hasattr(plugin_module, "on_import_batch_post"):
+        on_import_batch_post = plugin_module.on_import_batch_post
 
 
 def unregister_plugin():
     if plugin_module is not None:
         plugin_module.unregister()
-    global on_import_post
+    global on_import_post, on_import_batch_post
     on_import_post = _nop
+    on_import_batch_post = _import_batch_post_fallback
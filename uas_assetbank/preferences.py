@@ -17,7 +17,6 @@
 
 
 from pathlib import Path
-import json
 import os
 
 import bpy
@@ -27,7 +26,11 @@ from bpy.props import (
     CollectionProperty,
     IntProperty,
     BoolProperty,
+    EnumProperty,
 )
+from . import backups
+from . import library_format
+from . import refresh_scheduler
 from .plugin_manager import unregister_plugin, register_plugin
 
 
@@ -62,8 +65,9 @@ class UAS_AssetBankPreferences_RemoveLibrary(bpy.types.Operator):
     def execute(self, context):
         prefs = get_preferences()
         if 0 <= self.index < len(prefs.libraries):
+            name = prefs.libraries[self.index].name
             prefs.libraries.remove(self.index)
-            bpy.ops.uas.asset_bank_refresh()
+            refresh_scheduler.schedule(name)
             return {"FINISHED"}
 
         return {"CANCELLED"}
@@ -72,19 +76,19 @@ class UAS_AssetBankPreferences_RemoveLibrary(bpy.types.Operator):
 class UAS_AssetBankPreferences_Library(bpy.types.PropertyGroup):
     def path_updated(self, context):
         self["path"] = bpy.path.abspath(self["path"])
-        if not self["path"].endswith(".json"):
+        if not library_format.is_library_path(self["path"]):
             self["path"] += ".json"
 
         json_path = Path(self["path"])
         os.makedirs(json_path.parent, exist_ok=True)
         if self["path"] and not json_path.exists():
-            with open(self["path"], "w") as f:
-                json.dump({}, f, indent=2)
+            with open(self["path"], "wb") as f:
+                f.write(library_format.encode(self["path"], dict()))
 
-        bpy.ops.uas.asset_bank_refresh()
+        refresh_scheduler.schedule(self.name)
 
     def refresh_bank(self, context):
-        bpy.ops.uas.asset_bank_refresh()
+        refresh_scheduler.schedule(self.name)
 
     path: StringProperty(subtype="FILE_PATH", update=path_updated)
     name: StringProperty(update=refresh_bank)
@@ -105,6 +109,8 @@ class UAS_AssetBankPreferences(AddonPreferences):
             row = box.row(align=True)
             row.prop(self.libraries[i], "enabled", text="", emboss=True)
             row.prop(self.libraries[i], "name", text="")
+            if refresh_scheduler.is_pending(library.name):
+                row.label(text="", icon="SORTTIME")
             if library.enabled:
                 row = box.row(align=True)
                 split = row.split(factor=0.03)
@@ -122,6 +128,24 @@ class UAS_AssetBankPreferences(AddonPreferences):
         box = layout.box()
         box.prop(self, "thumbnails_resolution", text="Thumbnails Resolution")
         box.prop(self, "auto_save")
+        box.prop(self, "background_banking")
+        box.prop(self, "watch_libraries")
+        box.prop(self, "overlay_texture_budget")
+        layout.separator()
+
+        box = layout.box()
+        box.prop(self, "local_cache_enabled")
+        if self.local_cache_enabled:
+            box.prop(self, "local_cache_dir")
+            box.prop(self, "local_cache_size")
+            box.prop(self, "local_cache_link")
+        layout.separator()
+
+        box = layout.box()
+        box.prop(self, "compact_libraries")
+        box.prop(self, "backup_interval")
+        box.prop(self, "backup_count")
+        box.prop(self, "backup_compression")
         layout.separator()
 
         box = layout.box()
@@ -135,6 +159,12 @@ class UAS_AssetBankPreferences(AddonPreferences):
         else:
             register_plugin(Path(__file__).parent.joinpath("default_plugin.py"))
 
+    def backup_settings_updated(self, context):
+        backups.configure(self.backup_interval * 60, self.backup_count, self.backup_compression)
+
+    def compact_libraries_updated(self, context):
+        library_format.compact = self.compact_libraries
+
     libraries: CollectionProperty(type=UAS_AssetBankPreferences_Library)
     thumbnails_resolution: IntProperty(default=256, min=32, max=2048)
     auto_save: BoolProperty(
@@ -142,6 +172,65 @@ class UAS_AssetBankPreferences(AddonPreferences):
         description="Save the scene before banking. Saving can be slow if file is big or on network.",
     )
     plugin_path: StringProperty(subtype="FILE_PATH", update=plugin_path_updated)
+    background_banking: BoolProperty(
+        name="Bank In Background",
+        description="Publish and write the library in the background after banking, the ui returns immediately",
+        default=True,
+    )
+    local_cache_enabled: BoolProperty(
+        name="Local Cache Of Asset Files",
+        description="Copy the asset .blend files to a local folder and append from the copies",
+        default=False,
+    )
+    local_cache_dir: StringProperty(
+        name="Cache Folder", description="Defaults to a folder in the system temp directory", subtype="DIR_PATH"
+    )
+    local_cache_size: IntProperty(
+        name="Cache Size (MB)", description="Least recently used files are removed above this size", default=4096, min=1
+    )
+    local_cache_link: BoolProperty(
+        name="Link From Local Cache",
+        description="Also link from the local copies. Linked data then references the copies instead of the shared files.",
+        default=False,
+    )
+    watch_libraries: BoolProperty(
+        name="Reload Changed Libraries",
+        description="Watch the library files and reload the assets of a library when it is changed by someone else",
+        default=True,
+    )
+    overlay_texture_budget: IntProperty(
+        name="Overlay Texture Memory (MB)",
+        description="GPU memory used to keep the thumbnails of the viewport overlay between pages",
+        default=256,
+        min=16,
+    )
+    compact_libraries: BoolProperty(
+        name="Compact Libraries",
+        description="Write the .json libraries without indentation. Smaller and faster to read, harder to edit by hand. "
+        "Libraries named .json.gz or .json.zst are compressed and always compact",
+        default=False,
+        update=compact_libraries_updated,
+    )
+    backup_interval: IntProperty(
+        name="Backup Interval (min)",
+        description="Minimum time between two backups of a library",
+        default=10,
+        min=0,
+        update=backup_settings_updated,
+    )
+    backup_count: IntProperty(
+        name="Backups Kept",
+        description="Number of backup points kept for each library",
+        default=10,
+        min=1,
+        update=backup_settings_updated,
+    )
+    backup_compression: EnumProperty(
+        name="Backup Compression",
+        items=(("GZIP", "Gzip", "Faster"), ("LZMA", "LZMA", "Smaller")),
+        default="GZIP",
+        update=backup_settings_updated,
+    )
 
 
 _classes = (
@@ -152,11 +241,28 @@ _classes = (
 )
 
 
+def _apply_settings():
+    """
+    Hand the settings used outside of Blender's main thread to their modules.
+    """
+    # The addon preferences are not available yet while the addon registers.
+    try:
+        prefs = get_preferences()
+    except KeyError:
+        return None
+    prefs.backup_settings_updated(bpy.context)
+    prefs.compact_libraries_updated(bpy.context)
+    return None
+
+
 def register():
     for cls in _classes:
         bpy.utils.register_class(cls)
+    bpy.app.timers.register(_apply_settings, first_interval=0.1)
 
 
 def unregister():
+    if bpy.app.timers.is_registered(_apply_settings):
+        bpy.app.timers.unregister(_apply_settings)
     for cls in reversed(_classes):
         bpy.utils.unregister_class(cls)
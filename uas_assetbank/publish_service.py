@@ -0,0 +1,146 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Pool of long lived background Blender processes used by plugins to publish assets.
+
+Starting Blender for each banked asset is what makes publishing slow. The pool starts the workers once and sends them
+jobs through their stdin. A worker is a python script run with "blender --background --python script -- --server",
+it must loop on its stdin lines, each one being a json job:
+    {"dest_blend": ..., "src_blend": ..., "collection": ...}
+and answer each job with one stdout line made of RESULT_PREFIX followed by a json result:
+    {"ok": true} or {"ok": false, "error": "message"}
+Other stdout lines (Blender logs) are ignored. See plugin_example/asset_bank_publish.py for a worker.
+"""
+
+import json
+import queue
+import subprocess
+import threading
+
+RESULT_PREFIX = "UAS_ASSETBANK_PUBLISH:"
+
+
+class PublishError(Exception):
+    pass
+
+
+class _Worker:
+    def __init__(self, blender_path, script):
+        self.process = subprocess.Popen(
+            [blender_path, "--background", "--factory-startup", "--python", script, "--", "--server"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            bufsize=1,
+        )
+
+    def run(self, job: dict) -> dict:
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        for line in self.process.stdout:
+            if line.startswith(RESULT_PREFIX):
+                return json.loads(line[len(RESULT_PREFIX) :])
+        raise PublishError(f"Publish worker exited with code {self.process.wait()}.")
+
+    def close(self):
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=10)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+class PublishPool:
+    """
+    Up to size workers are started on demand and kept alive. publish can be called from several threads at once.
+    """
+
+    def __init__(self, blender_path, script, size=2):
+        self.blender_path = blender_path
+        self.script = script
+        self.size = size
+        self._idle = queue.Queue()
+        self._workers = list()
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _Worker:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if len(self._workers) < self.size:
+                    worker = _Worker(self.blender_path, self.script)
+                    self._workers.append(worker)
+                    return worker
+            # Wait for a busy worker, checking again from time to time in case one of them died.
+            try:
+                return self._idle.get(timeout=1.0)
+            except queue.Empty:
+                pass
+
+    def _discard(self, worker):
+        worker.close()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def publish(self, dest_blend, src_blend, collection_name):
+        """
+        Ask a worker to append a collection from src_blend and to save it as dest_blend. Blocks until done.
+        Raise PublishError on failure.
+        """
+        worker = self._acquire()
+        try:
+            result = worker.run(dict(dest_blend=dest_blend, src_blend=src_blend, collection=collection_name))
+        except (OSError, ValueError, PublishError):
+            # The worker is in an unknown state, next jobs will start a new one.
+            self._discard(worker)
+            raise
+        self._idle.put(worker)
+        if not result.get("ok"):
+            raise PublishError(result.get("error", f"Could not publish {collection_name}."))
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+            self._idle = queue.Queue()
+        for worker in workers:
+            worker.close()
+
+
+_pools = dict()  # (blender path, script) -> PublishPool
+
+
+def get_pool(blender_path, script, size=2) -> PublishPool:
+    """
+    Return the shared pool for a worker script, creating it if needed.
+    """
+    key = (str(blender_path), str(script))
+    if key not in _pools:
+        _pools[key] = PublishPool(str(blender_path), str(script), size)
+    return _pools[key]
+
+
+def shutdown():
+    for pool in _pools.values():
+        pool.close()
+    _pools.clear()
@@ -0,0 +1,132 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Deferred reloads of the libraries.
+
+The preference callbacks and the operators changing a library mark it dirty instead of reloading the assets at once.
+A timer then reloads all the dirty libraries together, once, so that toggling several libraries or editing a library
+name reloads each library a single time. The assets of the other libraries are kept as they are.
+
+The enabled libraries are also watched for changes made by other processes, eg another artist banking into a shared
+library (see library_watcher). A changed library is scheduled like the others and only its changed assets are updated.
+"""
+
+import os
+
+import bpy
+
+from . import library_watcher
+
+DELAY = 0.2  # seconds
+WATCH_INTERVAL = 1.0  # seconds
+
+_dirty = set()  # Names of the libraries to reload.
+_watcher = None
+
+
+def schedule(library_name):
+    """
+    Mark a library to be reloaded on the next timer tick. A library renamed, disabled or removed is scheduled with its
+    new name, the assets of libraries which are not enabled anymore are dropped by any reload.
+    """
+    _dirty.add(library_name)
+    if not bpy.app.timers.is_registered(_reload):
+        bpy.app.timers.register(_reload, first_interval=DELAY)
+    _tag_redraw()
+
+
+def is_pending(library_name=None) -> bool:
+    if library_name is None:
+        return bool(_dirty)
+    return library_name in _dirty
+
+
+def pending_libraries():
+    return sorted(_dirty)
+
+
+def _tag_redraw():
+    window_manager = bpy.context.window_manager
+    if window_manager is None:
+        return
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if area.type in ("VIEW_3D", "PREFERENCES"):
+                area.tag_redraw()
+
+
+def _reload():
+    names = sorted(_dirty)
+    _dirty.clear()
+    if names:
+        bpy.ops.uas.asset_bank_refresh(libraries=[{"name": name} for name in names])
+    _tag_redraw()
+    return None
+
+
+def cancel():
+    """
+    Forget the dirty libraries, eg when all the libraries are reloaded anyway.
+    """
+    if bpy.app.timers.is_registered(_reload):
+        bpy.app.timers.unregister(_reload)
+    _dirty.clear()
+
+
+def _stop_watcher():
+    global _watcher
+    if _watcher is not None:
+        _watcher.close()
+        _watcher = None
+
+
+def _watch():
+    """
+    Timer polling the library watcher.
+    """
+    global _watcher
+    # The addon preferences are not available yet while the addon registers.
+    try:
+        prefs = bpy.context.preferences.addons[__package__].preferences
+    except KeyError:
+        return WATCH_INTERVAL
+    if not prefs.watch_libraries:
+        _stop_watcher()
+        return WATCH_INTERVAL
+
+    if _watcher is None:
+        _watcher = library_watcher.create_watcher()
+    libraries = dict()  # path -> library name
+    for lib in prefs.libraries:
+        if lib.enabled and lib.path:
+            libraries.setdefault(os.path.normpath(lib.path), lib.name)
+    _watcher.set_paths(libraries)
+    for path in _watcher.poll():
+        schedule(libraries[path])
+    return WATCH_INTERVAL
+
+
+def register():
+    bpy.app.timers.register(_watch, first_interval=WATCH_INTERVAL, persistent=True)
+
+
+def unregister():
+    if bpy.app.timers.is_registered(_watch):
+        bpy.app.timers.unregister(_watch)
+    _stop_watcher()
+    cancel()
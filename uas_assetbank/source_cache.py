@@ -0,0 +1,241 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Local mirror of the banked .blend files, so that imports read from a local disk instead of the file server.
+
+Copies are validated against the source mtime and size, the mirror is capped in size and the least recently used
+copies are evicted first. Usage statistics are kept in an index.json in the cache directory and are used to prefetch
+the recently and frequently used assets in the background. Copies in use by the open file, eg linked from, are never
+evicted, see set_in_use.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+INDEX_NAME = "index.json"
+
+_lock = threading.RLock()
+_indices = dict()  # cache dir -> index (source path -> entry dict)
+_prefetch_thread = None
+_in_use = set()  # Normalized paths of the copies the open file uses.
+
+
+def default_cache_dir():
+    return os.path.join(tempfile.gettempdir(), "uas_assetbank_cache")
+
+
+def _load_index(cache_dir):
+    if cache_dir not in _indices:
+        index = dict()
+        index_path = Path(cache_dir, INDEX_NAME)
+        if index_path.is_file():
+            try:
+                with open(index_path, "r") as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = dict()
+        _indices[cache_dir] = index
+    return _indices[cache_dir]
+
+
+def _save_index(cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = Path(cache_dir, INDEX_NAME)
+    tmp_path = index_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(_indices[cache_dir], f)
+    os.replace(tmp_path, index_path)
+
+
+def _local_name(source_path):
+    digest = hashlib.sha1(os.path.normcase(source_path).encode("utf-8")).hexdigest()[:12]
+    return f"{Path(source_path).stem}_{digest}.blend"
+
+
+def _is_valid(cache_dir, entry, source_stat):
+    return (
+        entry.get("mtime") == source_stat.st_mtime_ns
+        and entry.get("size") == source_stat.st_size
+        and Path(cache_dir, entry["local"]).is_file()
+    )
+
+
+def _normalize(path):
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def set_in_use(paths):
+    """
+    Set the files used by the open file, eg its linked libraries. The copies among them are not evicted.
+    """
+    with _lock:
+        _in_use.clear()
+        _in_use.update(_normalize(path) for path in paths)
+
+
+def known_copy(source_path, cache_dir):
+    """
+    Path of the local copy of a source if there is one, without checking that it is up to date nor touching the source.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    with _lock:
+        entry = _load_index(cache_dir).get(source_path)
+        if entry is None or "local" not in entry or entry.get("size") is None:
+            return None
+        return str(Path(cache_dir, entry["local"]))
+
+
+def _evict(cache_dir, max_size, keep):
+    """
+    Remove the least recently used copies until the mirror fits in max_size bytes. Copies in use are kept.
+    """
+    index = _load_index(cache_dir)
+    cached = [(entry.get("last_used", 0), source) for source, entry in index.items() if entry.get("size") is not None]
+    total = sum(index[source]["size"] for _, source in cached)
+    for _last_used, source in sorted(cached):
+        if total <= max_size:
+            break
+        entry = index[source]
+        if source == keep or _normalize(Path(cache_dir, entry["local"])) in _in_use:
+            continue
+        try:
+            os.remove(Path(cache_dir, entry["local"]))
+        except OSError:
+            pass
+        total -= entry["size"]
+        entry["size"] = None
+        entry["mtime"] = None
+
+
+def _copy(cache_dir, source_path, source_stat, max_size):
+    """
+    Copy a source into the mirror and make room for it. Return the local path, None if it does not fit.
+    The copy itself is done without holding the lock, copying big files over the network takes time.
+    """
+    if source_stat.st_size > max_size:
+        return None
+
+    os.makedirs(cache_dir, exist_ok=True)
+    local_name = _local_name(source_path)
+    local_path = Path(cache_dir, local_name)
+    tmp_path = Path(cache_dir, f"{local_name}.{threading.get_ident()}.part")
+    try:
+        shutil.copyfile(source_path, tmp_path)
+        with _lock:
+            entry = _load_index(cache_dir).setdefault(source_path, {"uses": 0, "last_used": time.time()})
+            entry["size"] = None  # Not counted while making room for it.
+            _evict(cache_dir, max_size - source_stat.st_size, keep=source_path)
+            os.replace(tmp_path, local_path)
+            entry.update(local=local_name, mtime=source_stat.st_mtime_ns, size=source_stat.st_size)
+            _save_index(cache_dir)
+    finally:
+        if tmp_path.exists():
+            os.remove(tmp_path)
+    return str(local_path)
+
+
+def get_local_copy(source_path, cache_dir, max_size):
+    """
+    Return the path of an up to date local copy of a .blend, copying it if needed, and record its usage.
+    Return source_path itself if the copy is not possible.
+
+    :param max_size: Size limit of the mirror in bytes.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    try:
+        source_stat = os.stat(source_path)
+    except OSError:
+        return source_path
+
+    with _lock:
+        entry = _load_index(cache_dir).setdefault(source_path, {"uses": 0})
+        entry["uses"] = entry.get("uses", 0) + 1
+        entry["last_used"] = time.time()
+        if "local" in entry and _is_valid(cache_dir, entry, source_stat):
+            _save_index(cache_dir)
+            return str(Path(cache_dir, entry["local"]))
+
+    try:
+        local_path = _copy(cache_dir, source_path, source_stat, max_size)
+    except OSError as e:
+        print(f"Could not copy {source_path} to the local cache: {e}")
+        local_path = None
+    return local_path or source_path
+
+
+def record_usage(source_path, cache_dir):
+    """
+    Count a use of a source which is not read from the mirror, eg a linked asset. It makes it a prefetch candidate.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    with _lock:
+        entry = _load_index(cache_dir).setdefault(source_path, {"uses": 0})
+        entry["uses"] = entry.get("uses", 0) + 1
+        entry["last_used"] = time.time()
+        _save_index(cache_dir)
+
+
+def _prefetch_candidates(cache_dir, count):
+    """
+    The most used sources, uses being weighted down by the number of days since their last use.
+    """
+    now = time.time()
+    index = _load_index(cache_dir)
+
+    def score(source):
+        entry = index[source]
+        age_days = (now - entry.get("last_used", 0)) / 86400.0
+        return entry.get("uses", 0) / (1.0 + age_days)
+
+    return sorted(index, key=score, reverse=True)[:count]
+
+
+def _prefetch(cache_dir, max_size, count):
+    with _lock:
+        sources = _prefetch_candidates(cache_dir, count)
+
+    for source_path in sources:
+        try:
+            source_stat = os.stat(source_path)
+            with _lock:
+                entry = _load_index(cache_dir)[source_path]
+                if "local" in entry and _is_valid(cache_dir, entry, source_stat):
+                    continue
+            _copy(cache_dir, source_path, source_stat, max_size)
+        except OSError as e:
+            print(f"Could not prefetch {source_path}: {e}")
+
+
+def prefetch(cache_dir, max_size, count=20):
+    """
+    Refresh the local copies of the most recently and frequently used sources in a background thread.
+    """
+    global _prefetch_thread
+    if _prefetch_thread is not None and _prefetch_thread.is_alive():
+        return
+    cache_dir = cache_dir or default_cache_dir()
+    _prefetch_thread = threading.Thread(
+        target=_prefetch, args=(cache_dir, max_size, count), name="uas_assetbank_prefetch", daemon=True
+    )
+    _prefetch_thread.start()
@@ -0,0 +1,48 @@
+# GPLv3 License
+#
+# Copyright (C) 2020 Ubisoft
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Thumbnail pixels for the gpu textures of the viewport overlay.
+
+ImagePreview.image_pixels holds one int per pixel, the RGBA bytes of the pixel packed in memory order. They are read in
+bulk into an int array which bgl.Buffer wraps without copy, and uploaded as 8 bit RGBA. This avoids the python float
+per channel of image_pixels_float and uses 4 times less memory.
+
+This module does not use bpy, see extra/benchmarks/thumbnail_pixels_benchmark.py.
+"""
+
+from array import array
+
+
+def new_pixel_array(width, height) -> array:
+    return array("i", [0]) * (width * height)
+
+
+def read_rgba8(image_pixels, width, height) -> array:
+    """
+    Return the pixels of an ImagePreview (its image_pixels) as an int array, one packed RGBA8 pixel per item.
+    """
+    pixels = new_pixel_array(width, height)
+    if len(image_pixels) != len(pixels):
+        raise ValueError(f"Expected {len(pixels)} pixels for {width}x{height}, got {len(image_pixels)}.")
+    foreach_get = getattr(image_pixels, "foreach_get", None)
+    if foreach_get is not None:
+        foreach_get(pixels)
+    else:
+        # Sequences without bulk access.
+        pixels[:] = array("i", image_pixels)
+    return pixels
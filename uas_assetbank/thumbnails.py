@@ -16,20 +16,34 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import bpy
 import bpy.utils.previews
 
 from .utils import get_thumbnail_path
+from . import blend_reader
+
 previews_cols = dict()
+_revisions = dict()  # (library, asset identifier) -> number of reloads, see thumbnail_revision
+_clean_count = 0
+
+
+def thumbnail_revision(library, asset_identifier):
+    """
+    A value which changes each time the thumbnail of an asset may have changed, for caches of thumbnail data.
+    """
+    return _clean_count, _revisions.get((library, asset_identifier), 0)
 
 
 def clean_thumbnails():
-    global previews_cols
+    global previews_cols, _clean_count
     for pcoll in previews_cols.values():
         bpy.utils.previews.remove(pcoll)
     previews_cols.clear()
+    _clean_count += 1
 
 
 def reload_thumbnail(library, asset_identifier):
@@ -38,6 +52,7 @@ def reload_thumbnail(library, asset_identifier):
     """
     global previews_cols
     if library and asset_identifier:
+        _revisions[(library, asset_identifier)] = _revisions.get((library, asset_identifier), 0) + 1
         if library in previews_cols:
             if asset_identifier in previews_cols[library]:
                 previews_cols[library][asset_identifier].reload()
@@ -57,6 +72,8 @@ def get_thumbnail(asset):
             thumb_path = asset.thumbnail_path
         else:
             thumb_path = get_thumbnail_path(asset.file, asset.data_name)
+        if not Path(thumb_path).is_file():
+            thumb_path = get_embedded_preview_path(thumb_path)
         if Path(thumb_path).is_file():
             thumb = previews_cols[asset.library].load(
                 asset.identifier, thumb_path, "IMAGE"
@@ -67,6 +84,46 @@ def get_thumbnail(asset):
     return thumb
 
 
+def get_embedded_preview_path(thumbnail_path):
+    """
+    Path of the png extracted from the .blend preview, used when an asset has no thumbnail of its own.
+    """
+    return str(Path(thumbnail_path).with_suffix(".png"))
+
+
+def _extract_blend_previews(blend_path, previews_to_write):
+    """
+    Read the embedded previews of one .blend and write the requested ones. Run in a worker thread.
+    """
+    try:
+        previews = blend_reader.read_collection_previews(blend_path, previews_to_write.keys())
+    except (OSError, blend_reader.BlendFileError) as e:
+        print(f"Could not read previews from {blend_path}: {e}")
+        return 0
+
+    for collection_name, preview in previews.items():
+        blend_reader.write_png(previews_to_write[collection_name], preview)
+    return len(previews)
+
+
+def extract_missing_previews(assets, max_workers=8):
+    """
+    Fill the missing thumbnails of assets ( asset_store records ) with the previews embedded in their .blend.
+    Each .blend is read once, files are processed in parallel. Return the number of written previews.
+    """
+    to_extract = defaultdict(dict)  # blend path -> collection name -> png path
+    for asset in assets:
+        thumb_path = asset.thumbnail_path or get_thumbnail_path(asset.file, asset.data_name)
+        embedded_path = get_embedded_preview_path(thumb_path)
+        if not Path(thumb_path).is_file() and not Path(embedded_path).is_file() and Path(asset.file).is_file():
+            to_extract[asset.file][asset.data_name] = embedded_path
+
+    if not to_extract:
+        return 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(_extract_blend_previews, to_extract.keys(), to_extract.values()))
+
+
 def register():
     global previews_cols
     pcoll = bpy.utils.previews.new()
@@ -16,8 +16,10 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 from pathlib import Path
 
-from .. import utils
+from .. import asset_view
+from .. import refresh_scheduler
 from .. import icons
+from .. import banking_jobs
 
 from .. import preferences
 from .. import display_version
@@ -46,7 +48,7 @@ class UAS_PT_AssetInfo(bpy.types.Panel):
     def draw(self, context):
         props = context.window_manager.uas_asset_bank
         layout = self.layout
-        if props.selected_index >= 0:
+        if 0 <= props.selected_index < len(props.assets):
             box = layout.box()
             # box.prop ( props, "thumbnail_scale", text = "Preview Size" )
             asset = props.assets[props.selected_index]
@@ -56,7 +58,7 @@ class UAS_PT_AssetInfo(bpy.types.Panel):
                 "uas.asset_bank_generate_thumbnail",
                 text="Regenerate Thumbnail",
                 icon="FILE_REFRESH",
-            ).index = props.selected_index
+            ).identifier = asset.identifier
 
             box = layout.box()
             split = box.split(factor=0.1, align=True)
@@ -153,17 +155,23 @@ class UAS_PT_AssetBank(bpy.types.Panel):
                 box = col.box()
                 col = box.column(align=True)
                 col.prop(props, "library", text="Bank to", icon="HOME")
+                col.prop(props, "bank_children")
                 row = col.row()
                 row.scale_y = 2
                 row.prop(props, "collection", text="")
                 # row.operator ( "uas.asset_bank_store", text = "", icon = "EXPORT" )
 
+            self.draw_banking_jobs(layout)
+
             col = layout.column()
             col.separator(factor=2)
             row = col.row()
             row.operator(
                 "uas.asset_bank_refresh", text="Reload Libraries", icon="FILE_REFRESH"
             )
+            row.operator("uas.asset_bank_extract_previews", text="", icon="IMAGE_DATA")
+            if refresh_scheduler.is_pending():
+                col.label(text=f"Reloading {', '.join(refresh_scheduler.pending_libraries())}...", icon="SORTTIME")
             col.template_list(
                 "UAS_UL_AssetBank_Items",
                 "",
@@ -173,6 +181,32 @@ class UAS_PT_AssetBank(bpy.types.Panel):
                 "selected_index",
                 rows=10,
             )
+            page_count = asset_view.page_count(props)
+            if page_count > 1:
+                row = col.row(align=True)
+                row.label(text=f"{len(asset_view.view)} assets")
+                row.prop(props, "page", text=f"Page (of {page_count})")
+            row = col.row(align=True)
+            row.label(text="Checked Assets:")
+            op = row.operator("uas.asset_bank_import_batch", text="Append", icon="IMPORT")
+            op.append = True
+            op = row.operator("uas.asset_bank_import_batch", text="Link", icon="LINK_BLEND")
+            op.append = False
+
+    def draw_banking_jobs(self, layout):
+        if not banking_jobs.jobs:
+            return
+        box = layout.box()
+        for job in banking_jobs.jobs:
+            row = box.row(align=True)
+            if job.status == banking_jobs.FAILED:
+                row.alert = True
+                row.label(text=f"{job.label}: {job.error}", icon="ERROR")
+                row.alert = False
+                row.operator("uas.asset_bank_retry_job", text="", icon="FILE_REFRESH").job_id = job.id
+                row.operator("uas.asset_bank_dismiss_job", text="", icon="X").job_id = job.id
+            else:
+                row.label(text=f"{job.label}: {job.status.lower()}", icon="SORTTIME")
 
 
 class UAS_UL_AssetBank_Items(bpy.types.UIList):
@@ -188,20 +222,26 @@ class UAS_UL_AssetBank_Items(bpy.types.UIList):
         row = col.row(align=True)
         split = row.split(factor=0.75)
         row = split.row()
+        row.prop(item, "checked", text="")
         row.template_icon(icon_value=thumb.icon_id)
-        row.label(text=f"{item.nice_name}")
+        if item.broken:
+            row.alert = True
+            row.label(text=f"{item.nice_name}", icon="ERROR")
+            row.alert = False
+        else:
+            row.label(text=f"{item.nice_name}")
         row = split.row(align=True)
         row.label(text=f"{item.library}")
         op = row.operator("uas.asset_bank_import", text="", icon="IMPORT")
-        op.index = index
+        op.identifier = item.identifier
         op.append = True
 
         op = row.operator("uas.asset_bank_import", text="", icon="LINK_BLEND")
-        op.index = index
+        op.identifier = item.identifier
         op.append = False
 
         row.alert = True
-        row.operator("uas.asset_bank_delete", text="", icon="TRASH").index = index
+        row.operator("uas.asset_bank_delete", text="", icon="TRASH").identifier = item.identifier
         row.alert = False
 
     def draw_filter(self, context, layout):
@@ -210,27 +250,16 @@ class UAS_UL_AssetBank_Items(bpy.types.UIList):
 
         subrow = row.row(align=True)
         subrow.prop(props, "filter_name", text="")
-        icon = "ZOOM_OUT" if self.use_filter_invert else "ARROW_LEFTRIGHT"
-        subrow.prop(self, "use_filter_invert", text="", icon=icon, toggle=True)
+        icon = "ZOOM_OUT" if props.filter_invert else "ARROW_LEFTRIGHT"
+        subrow.prop(props, "filter_invert", text="", icon=icon, toggle=True)
 
-        icon = "TRIA_UP" if self.use_filter_sort_reverse else "TRIA_DOWN"
-        row.prop(self, "use_filter_sort_reverse", text="", icon=icon)
+        icon = "TRIA_UP" if props.sort_reverse else "TRIA_DOWN"
+        row.prop(props, "sort_reverse", text="", icon=icon)
 
     def filter_items(self, context, data, prop):
-        helper_funcs = bpy.types.UI_UL_list
-        assets = getattr(data, prop)
-        flt_flags = []
-        filter_name = context.window_manager.uas_asset_bank.filter_name
-        if filter_name:
-            for asset in assets:
-                flag = utils.asset_match_filter(
-                    asset, filter_name.strip().lower().split(), self.bitflag_filter_item
-                )
-                flt_flags.append(flag)
-
-        flt_neworder = helper_funcs.sort_items_by_name(assets, "data_name")
-
-        return flt_flags, flt_neworder
+        # The window is already the filtered and sorted page of the assets, see asset_view.update_window. The toggles
+        # of the filter are properties of uas_asset_bank so that the view shared with the overlay follows them.
+        return [], []
 
 
 classes = (
@@ -45,6 +45,9 @@ class ASSETBANK_MT_prefs_main_menu(Menu):  # noqa 801
         #     "assetbank.open_documentation_url", text="Documentation"
         # ).path = "https://gitlab.com/ubisoft-animation-studio/mixer#mixer"
 
+        row = layout.row(align=True)
+        row.operator("uas.asset_bank_restore_backup", text="Restore Library Backup...")
+
         row = layout.row(align=True)
         row.operator("assetbank.about", text="About...")
 
@@ -15,14 +15,18 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from array import array
+from contextlib import contextmanager
 from pathlib import Path
+import hashlib
 import os
-import json
-import shutil
-from typing import List
+from typing import Dict, List
 
 import bpy
 
+from .. import backups
+from .. import library_store
+
 
 def get_thumbnail_path(blend, collection_name):
     """
@@ -32,32 +36,111 @@ def get_thumbnail_path(blend, collection_name):
     return str(blend.parent.joinpath("thumbnails", f"UASBANK_{blend.stem}_{collection_name}.jpg"))
 
 
-def export_thumbnails(context, path, resolution=256):
+@contextmanager
+def _thumbnail_render_settings(context, resolution):
     """
-    Takes a screenshot of the scene and output it to a file.
+    Setup the scene render settings for thumbnails and restore them afterward.
     """
+    render = context.scene.render
+    backup_out_path = render.filepath
+    backup_extention = render.image_settings.file_format
+    backup_res_x = render.resolution_x
+    backup_res_y = render.resolution_y
+    render.resolution_y = resolution
+    render.resolution_x = resolution
+    render.image_settings.file_format = "JPEG"
+    try:
+        yield render
+    finally:
+        render.image_settings.file_format = backup_extention
+        render.filepath = backup_out_path
+        render.resolution_y = backup_res_y
+        render.resolution_x = backup_res_x
+
+
+def _write_screenshot(render, path):
     if not os.path.isdir(os.path.dirname(path)):
         os.makedirs(os.path.dirname(path))
-    backup_out_path = context.scene.render.filepath
-    backup_extention = context.scene.render.image_settings.file_format
-    backup_res_x = context.scene.render.resolution_x
-    backup_res_y = context.scene.render.resolution_y
-    context.scene.render.resolution_y = resolution
-    context.scene.render.resolution_x = resolution
-
-    context.scene.render.filepath = path
-    context.scene.render.image_settings.file_format = "JPEG"
+    render.filepath = path
     bpy.ops.render.opengl(write_still=True)
-    context.scene.render.image_settings.file_format = backup_extention
-    context.scene.render.filepath = backup_out_path
-    context.scene.render.resolution_y = backup_res_y
-    context.scene.render.resolution_x = backup_res_x
+
+
+def export_thumbnails(context, path, resolution=256):
+    """
+    Takes a screenshot of the scene and output it to a file.
+    """
+    with _thumbnail_render_settings(context, resolution) as render:
+        _write_screenshot(render, path)
+
+
+def _find_layer_collection(layer_collection, collection):
+    if layer_collection.collection == collection:
+        return layer_collection
+    for child in layer_collection.children:
+        found = _find_layer_collection(child, collection)
+        if found is not None:
+            return found
+    return None
+
+
+def export_collection_thumbnails(context, thumbnails, resolution=256):
+    """
+    Takes one screenshot per (path, collection) pair, in a single render settings setup.
+    When there are several collections, the other ones are hidden in the viewport during each screenshot.
+    """
+    layers = [_find_layer_collection(context.view_layer.layer_collection, col) for _path, col in thumbnails]
+    hide_backup = [layer.hide_viewport if layer is not None else None for layer in layers]
+    try:
+        with _thumbnail_render_settings(context, resolution) as render:
+            for i, (path, _col) in enumerate(thumbnails):
+                if len(thumbnails) > 1:
+                    for j, layer in enumerate(layers):
+                        if layer is not None:
+                            layer.hide_viewport = i != j
+                _write_screenshot(render, path)
+    finally:
+        for layer, hide in zip(layers, hide_backup):
+            if layer is not None:
+                layer.hide_viewport = hide
+
+
+def make_entry(
+    collection_name,
+    blend_path,
+    thumbnail_path=None,
+    tags: List[str] = None,
+    metadata: dict = None,
+    fingerprint: str = None,
+):
+    """
+    Build the json content of an asset entry.
+    """
+    d = dict(blend_path=blend_path, data_name=collection_name)
+    if thumbnail_path is not None:
+        d["thumbnail_path"] = thumbnail_path
+    if tags is not None:
+        d["tags"] = tags
+    if metadata is not None:
+        d["metadata"] = metadata
+    if fingerprint is not None:
+        d["fingerprint"] = fingerprint
+    return d
 
 
 def backup_file(filepath):
-    path = Path(filepath)
-    if path.is_file():
-        shutil.copy(path, path.parent.joinpath(f"{path.stem}_backup{path.suffix}"))
+    """
+    Make a backup point of a json library now, see the backups module.
+    """
+    backups.backup(filepath, force=True)
+
+
+def add_entries(json_path, entries: Dict[str, dict], backup=True):
+    """
+    Add several asset entries (key -> entry built with make_entry) into a json library,
+    and optonnaly backup the existing json prior to adding the entries.
+    The file is written by the library store after a short quiet period, reading the library shows the entries at once.
+    """
+    library_store.update(json_path, entries=entries, backup=backup)
 
 
 def add_entry(
@@ -73,53 +156,80 @@ def add_entry(
     """
     Add an asset entry into a json librarie and optonnaly backup the existing json prior to adding the entry.
     """
-    data = dict()
-    if json_path and Path(json_path).exists():
-        if backup:
-            backup_file(json_path)
-        with open(json_path, "r") as f:
-            data = json.load(f)
-
-    with open(json_path, "w") as f:
-        d = dict(blend_path=blend_path, data_name=collection_name)
-        if thumbnail_path is not None:
-            d["thumbnail_path"] = thumbnail_path
-        if tags is not None:
-            d["tags"] = tags
-        if metadata is not None:
-            d["metadata"] = metadata
-
-        data[key] = d
-        if data:
-            json.dump(data, f, indent=2)
+    add_entries(json_path, {key: make_entry(collection_name, blend_path, thumbnail_path, tags, metadata)}, backup)
 
 
 def delete_entry(json_path, key, backup=True):
     """
     Remove the asset in the json and optionnaly backup the current json.
     """
-    if json_path and Path(json_path).exists():
-        if backup:
-            backup_file(json_path)
-        with open(json_path, "r") as f:
-            data = json.load(f)
-        with open(json_path, "w") as f:
-            if key in data:
-                del data[key]
-                json.dump(data, f, indent=2)
+    if json_path and (Path(json_path).exists() or library_store.has_pending(json_path)):
+        library_store.update(json_path, deleted=[key], backup=backup)
 
 
 def list_entries(json_path) -> List[dict]:
     """
     Reads a jsonand return its content.
     """
-    if json_path and Path(json_path).exists():
-        with open(json_path, "r") as f:
-            data = json.load(f)
-        return data.items()
+    if json_path and (Path(json_path).exists() or library_store.has_pending(json_path)):
+        return library_store.load(json_path).items()
     return list()
 
 
+def _hash_mesh(digest, mesh):
+    vertices = array("f", [0.0]) * (len(mesh.vertices) * 3)
+    mesh.vertices.foreach_get("co", vertices)
+    loops = array("i", [0]) * len(mesh.loops)
+    mesh.loops.foreach_get("vertex_index", loops)
+    loop_totals = array("i", [0]) * len(mesh.polygons)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    digest.update(vertices.tobytes())
+    digest.update(loops.tobytes())
+    digest.update(loop_totals.tobytes())
+
+
+def file_fingerprint(path) -> str:
+    """
+    Fingerprint of a file from its size and modification time, eg of the .blend an entry points to. Any save of the
+    file changes it. None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"file:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def collection_fingerprint(collection) -> str:
+    """
+    Hash of the content of a collection: its hierarchy, objects, transforms, material and modifier names and mesh
+    geometry. Modifier settings, material content, UVs, shape keys and other object data are not hashed, so it can
+    only tell that a collection did not change when this is trusted, see UAS_AssetBank_Store.skip_unchanged.
+    """
+    digest = hashlib.sha1()
+    hashed_meshes = set()
+    to_visit = [collection]
+    while to_visit:
+        current = to_visit.pop()
+        digest.update(current.name.encode())
+        to_visit.extend(sorted(current.children, key=lambda c: c.name, reverse=True))
+    for obj in sorted(collection.all_objects, key=lambda o: o.name):
+        digest.update(f"{obj.name}|{obj.type}|{obj.parent.name if obj.parent else ''}".encode())
+        digest.update(array("f", [v for row in obj.matrix_world for v in row]).tobytes())
+        digest.update("|".join(f"{m.type}:{m.name}" for m in getattr(obj, "modifiers", [])).encode())
+        digest.update("|".join(slot.material.name for slot in obj.material_slots if slot.material).encode())
+        if obj.instance_collection is not None:
+            digest.update(obj.instance_collection.name.encode())
+        if obj.data is None:
+            continue
+        digest.update(obj.data.name.encode())
+        if obj.type == "MESH" and obj.data.name not in hashed_meshes:
+            hashed_meshes.add(obj.data.name)
+            _hash_mesh(digest, obj.data)
+
+    return digest.hexdigest()
+
+
 def get_entry_name(name, blend_path):
     """
     Get a unique entry name from a collection and a .blend path.